@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+# Import helper modules from utils
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
+from io_utils import load_data
+
+
+def load_data_loadtxt(file_path):
+    """Previous implementation of load_data: delimiter sniffed from the first line, then np.loadtxt."""
+    with open(file_path, 'r') as file:
+        first_line = file.readline()
+    delimiter = ',' if ',' in first_line else '\t' if '\t' in first_line else None
+    return np.loadtxt(file_path, delimiter=delimiter)
+
+
+def load_data_pandas(file_path):
+    """pandas C parser with its default ('high') float precision, which may differ in the last digit."""
+    import pandas as pd
+    return pd.read_csv(file_path, sep=r'\s+', header=None, engine='c').to_numpy()
+
+
+LOADERS = {"loadtxt": load_data_loadtxt, "load_data": load_data, "pandas": load_data_pandas}
+
+
+def best_time(loader, file_path, repeats):
+    """Best wall-clock time of repeated calls, in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        loader(file_path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the speed and the values of the data file loaders.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[500, 10_000, 100_000, 1_000_000],
+                        help="Numbers of rows of the generated test files.")
+    parser.add_argument("--repeats", type=int, default=5, help="Calls per loader and file (the best is reported).")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        print(f"{'rows':>10} {'loader':>10} {'time [s]':>12} {'speedup':>8} {'max |diff|':>12}")
+        for size in args.sizes:
+            file_path = os.path.join(temporary_dir, f"data_{size}.txt")
+            np.savetxt(file_path, rng.standard_normal((size, 2)), fmt="%.17g")  # as data_generator.py
+            reference = load_data_loadtxt(file_path)
+            reference_time = best_time(load_data_loadtxt, file_path, args.repeats)
+            for name, loader in LOADERS.items():
+                elapsed = reference_time if name == "loadtxt" else best_time(loader, file_path, args.repeats)
+                difference = np.max(np.abs(loader(file_path) - reference))
+                print(f"{size:>10} {name:>10} {elapsed:>12.5f} {reference_time / elapsed:>8.2f} {difference:>12.3g}")
+
+
+# Entry point of the script
+if __name__ == "__main__":
+    main()
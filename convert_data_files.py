@@ -0,0 +1,103 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+
+# Import helper modules from utils
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
+from interface_utils import discover_files
+from io_utils import load_data, write_data_file, data_file_extension, sort_index_path, save_sort_index, \
+    split_member_path, DATA_FILE_FORMATS, BUNDLE_FILE_NAMES
+
+
+def convert_data_file(file_path, file_format, remove_source=False, overwrite=False):
+    """
+    Convert one data file to another format, next to the original (e.g. 01.txt -> 01.npy). A replicate
+    of a bundle (<bundle path>#NN) is unpacked to NN.<format> next to the bundle.
+
+    The converted file is read back and compared with the original before the original is removed.
+    If the original has a sort index sidecar, one is written for the converted file.
+
+    :param file_path: Path to the data file or bundle member reference.
+    :param file_format: Target format, one of the DATA_FILE_FORMATS.
+    :param remove_source: If True, delete the original file and its sidecar after a successful conversion
+                          (bundles are never removed).
+    :param overwrite: If True, replace an existing converted file.
+    :return: "converted", "skipped" or "failed".
+    """
+    bundle_path, member_index = split_member_path(file_path)
+    if member_index is None:
+        target_path = os.path.splitext(file_path)[0] + data_file_extension(file_format)
+    else:
+        target_path = os.path.join(os.path.dirname(bundle_path), f"{member_index + 1:02d}")
+        target_path += data_file_extension(file_format)
+        remove_source = False
+    if target_path == file_path or (os.path.exists(target_path) and not overwrite):
+        return "skipped"
+    try:
+        data = np.asarray(load_data(file_path))
+        write_data_file(target_path, data)
+        if not np.array_equal(load_data(target_path), data, equal_nan=True):
+            os.remove(target_path)
+            print(f"[ERROR] {target_path} does not reproduce {file_path}; removed.")
+            return "failed"
+        if os.path.exists(sort_index_path(file_path)):
+            save_sort_index(target_path, data)
+        if remove_source:
+            os.remove(file_path)
+            if os.path.exists(sort_index_path(file_path)):
+                os.remove(sort_index_path(file_path))
+        return "converted"
+    except Exception as e:
+        print(f"[ERROR] Failed to convert {file_path}: {e}")
+        return "failed"
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a tree of data files to another file format.")
+    parser.add_argument("inputs", nargs="+",
+                        help="Data files, directories (scanned recursively), glob patterns or manifest files "
+                             "(@file forces a manifest).")
+    parser.add_argument("--to", dest="file_format", default="npy", choices=sorted(DATA_FILE_FORMATS),
+                        help="Target file format.")
+    parser.add_argument("--remove-source", action="store_true",
+                        help="Delete each original file once its conversion has been verified.")
+    parser.add_argument("--unpack-bundles", action="store_true",
+                        help="Also write every replicate of the bundles as a file of the target format.")
+    parser.add_argument("--overwrite", action="store_true", help="Replace the converted files that already exist.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (defaults to the number of CPUs).")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers <= 0:
+        parser.error("--workers must be a positive integer.")
+    return args
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    source_extensions = tuple(
+        extension for file_format, extension in DATA_FILE_FORMATS.items() if file_format != args.file_format
+    ) + tuple(BUNDLE_FILE_NAMES.values())
+    selected_files = [
+        file_path for file_path in discover_files(args.inputs, file_extension=source_extensions)
+        if args.unpack_bundles or split_member_path(file_path)[1] is None
+    ]
+    print(f"[INFO] {len(selected_files)} files to convert to {args.file_format}.")
+
+    convert = partial(convert_data_file, file_format=args.file_format, remove_source=args.remove_source,
+                      overwrite=args.overwrite)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = list(executor.map(convert, selected_files, chunksize=16))
+    print(f"[INFO] {outcomes.count('converted')} converted, {outcomes.count('skipped')} skipped, "
+          f"{outcomes.count('failed')} failed.")
+    if "failed" in outcomes:
+        sys.exit(1)
+
+
+# Entry point of the script
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,51 @@ def find_k_nearest_neighbors(matrix, k):
     distances, indices = nbrs.kneighbors(matrix)
     return indices[:, 1:], distances[:, 1:]  # Remove self-neighbor
 
-def compute_marginal_counts(matrix, epsilon):
+def count_neighbors_within_radius(sorted_values, values, radius):
+    """
+    For each value, counts the entries of a sorted column that satisfy |x_j - x_i| <= radius
+    (the point itself included), using binary searches on the sorted column.
+
+    With radius 0 the count is the length of the run of tied values, so discrete columns are
+    handled without any special case.
+
+    Parameters:
+        sorted_values (1D array-like): The column sorted in increasing order.
+        values (1D array-like): Query values (usually the unsorted column itself).
+        radius (1D array-like): Closed radius for each query value.
+
+    Returns:
+        np.ndarray: Array of shape (n_queries,) with the number of entries within the radius.
+    """
+    sorted_values = np.asarray(sorted_values)
+    values = np.asarray(values)
+    radius = np.asarray(radius)
+    n = sorted_values.shape[0]
+
+    lo = np.searchsorted(sorted_values, values - radius, side='left')
+    hi = np.searchsorted(sorted_values, values + radius, side='right')
+
+    # values -/+ radius are rounded, so move each bound until it agrees with |x_j - x_i| <= radius.
+    # Only entries within one rounding error of the boundary move, hence very few iterations.
+    while True:
+        grow = (lo > 0) & (np.abs(sorted_values[np.maximum(lo - 1, 0)] - values) <= radius)
+        lo -= grow
+        shrink = (lo < hi) & (np.abs(sorted_values[np.minimum(lo, n - 1)] - values) > radius)
+        lo += shrink
+        if not (grow.any() or shrink.any()):
+            break
+    while True:
+        grow = (hi < n) & (np.abs(sorted_values[np.minimum(hi, n - 1)] - values) <= radius)
+        hi += grow
+        shrink = (hi > lo) & (np.abs(sorted_values[np.maximum(hi - 1, 0)] - values) > radius)
+        hi -= shrink
+        if not (grow.any() or shrink.any()):
+            break
+
+    return hi - lo
+
+
+def compute_marginal_counts(matrix, epsilon, sorted_values=None):
     """
     Computes the marginal counts for a single variable (1D) using NearestNeighbors for efficiency.
     For each sample, counts how many points are within a specified distance threshold (epsilon/2).
@@ -34,10 +78,14 @@ def compute_marginal_counts(matrix, epsilon):
     Parameters:
         matrix (2D array-like): Input data for a single variable, reshaped as a column vector of shape (n_samples, 1).
         epsilon (1D array-like): Distance thresholds for each sample, provided as a vector.
+        sorted_values (1D array-like, optional): The variable sorted in increasing order (e.g. from a
+            precomputed sort index). If given, the counts are obtained by binary search instead of a ball tree.
 
     Returns:
         np.ndarray: Array of shape (n_samples,) containing the marginal counts for each sample.
     """
+    if sorted_values is not None:
+        return count_neighbors_within_radius(sorted_values, matrix.ravel(), epsilon / 2) - 1  # Exclude the point itself
 
     # Ensure the input matrix is in 2D format
     matrix = matrix.reshape(-1, 1)
@@ -57,7 +105,7 @@ def compute_marginal_counts(matrix, epsilon):
 
     return marginal_counts
 
-def mutual_information_1(dataset, k, n_jobs = 2):
+def mutual_information_1(dataset, k, n_jobs = 2, sort_index = None):
 
 	"""
 	Computes the mutual information among multiple 1D variables based on Grassberger's method.
@@ -65,6 +113,8 @@ def mutual_information_1(dataset, k, n_jobs = 2):
 	Parameters:
 	    dataset (2D array-like): Data matrix where each row is a sample and each column is a variable.
 	    k (int): Number of nearest neighbors to consider for the estimation.
+	    sort_index (dict, optional): Precomputed column sort index (see io_utils.load_sort_index); when
+	        given, the marginal counts reuse its sorted columns instead of building ball trees.
 	
     Returns:
         float: The estimated mutual information.
@@ -81,7 +131,8 @@ def mutual_information_1(dataset, k, n_jobs = 2):
 	# Step 2: Parallel computation of marginal counts
 	def compute_counts_for_variable(var_idx):
 		marginal_data = dataset[:, var_idx].reshape(-1, 1)
-		return np.maximum(0, compute_marginal_counts(marginal_data, epsilon))
+		sorted_values = sort_index["sorted"][:, var_idx] if sort_index is not None else None
+		return np.maximum(0, compute_marginal_counts(marginal_data, epsilon, sorted_values))
 
 	results = Parallel(n_jobs=n_jobs)(delayed(compute_counts_for_variable)(var_idx) for var_idx in range(n_variables))
 	marginal_counts = np.array(results)
@@ -27,8 +27,35 @@ def find_k_nearest_neighbors(matrix, k):
     return indices[:, 1:], distances[:, 1:]  # Remove self-neighbor
 
 
+def kth_neighbor_distances_sorted(sorted_values, k):
+    """
+    Finds the distance from each point of a sorted 1D variable to its k-th nearest neighbor.
+
+    In one dimension the k nearest neighbors of the point at sorted position p lie in a window
+    [p-k+j, p+j] for some j in 0..k, so the distance is the minimum over the k+1 windows of the
+    largest gap between p and the window ends.
+
+    Parameters:
+        sorted_values (1D array-like): The variable sorted in increasing order.
+        k (int): Order of the neighbor.
+
+    Returns:
+        np.ndarray: Distances to the k-th nearest neighbor, in sorted order.
+    """
+    sorted_values = np.asarray(sorted_values, dtype=float)
+    n_samples = sorted_values.shape[0]
+    padded = np.concatenate((np.full(k, -np.inf), sorted_values, np.full(k, np.inf)))
+
+    distances = np.full(n_samples, np.inf)
+    for j in range(k + 1):
+        left = sorted_values - padded[j:j + n_samples]
+        right = padded[k + j:k + j + n_samples] - sorted_values
+        np.minimum(distances, np.maximum(left, right), out=distances)
+    return distances
+
+
 @time_it
-def mutual_information_1_entropies_sum(dataset, k):
+def mutual_information_1_entropies_sum(dataset, k, sort_index=None):
 
 	"""
 	Computes the mutual information among multiple 1D variables based on Grassberger's method.
@@ -36,6 +63,8 @@ def mutual_information_1_entropies_sum(dataset, k):
 	Parameters:
 	    dataset (2D array-like): Data matrix where each row is a sample and each column is a variable.
 	    k (int): Number of nearest neighbors to consider for the estimation.
+	    sort_index (dict, optional): Precomputed column sort index (see io_utils.load_sort_index); when
+	        given, the marginal k-NN distances are read off the sorted columns instead of a KD-tree.
 	
     Returns:
         float: The estimated mutual information.
@@ -53,8 +82,12 @@ def mutual_information_1_entropies_sum(dataset, k):
 	for var_idx in range(n_variables):
 		# Extract the current variable as a 1D array
 		marginal_data = dataset[:, var_idx]
-		_, distances_marginal = find_k_nearest_neighbors(marginal_data.reshape(-1, 1), k)
-		epsilon_marginal_v[:, var_idx] = 2 * distances_marginal[:, k-1]
+		if sort_index is not None:
+			order = sort_index["order"][:, var_idx]
+			epsilon_marginal_v[order, var_idx] = 2 * kth_neighbor_distances_sorted(sort_index["sorted"][:, var_idx], k)
+		else:
+			_, distances_marginal = find_k_nearest_neighbors(marginal_data.reshape(-1, 1), k)
+			epsilon_marginal_v[:, var_idx] = 2 * distances_marginal[:, k-1]
 		entropy_marginal_means[var_idx] = np.mean(np.log(epsilon_marginal_v[:, var_idx]))
 		
 	mi = ( 
@@ -0,0 +1,94 @@
+import numpy as np
+import os
+import sys
+from scipy.stats import chi2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+from decorators import time_it
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from mutual_information_binning import rank_transform
+
+
+@time_it
+def mutual_information_adaptive_partitioning(data, alpha=0.05, sort_index=None):
+    """
+    Estimate mutual information with the adaptive recursive partitioning of Darbellay and Vajda.
+
+    The estimator works on the ranks of the two variables, where the marginals are uniform: every
+    cell is split at the midpoints of its rank ranges (the marginal medians) into four equiprobable
+    subcells, and a cell becomes terminal when a chi-square test does not reject uniformity of
+    its four subcell counts, i.e. conditional independence inside the cell. The root cell is
+    always split. All cells of one level are processed together, so each level costs O(n) and
+    the whole partition O(n log n).
+
+    :param data: 2D array of shape (n_samples, 2), where each row is a sample (x, y).
+    :param alpha: Significance level of the chi-square uniformity test (3 degrees of freedom).
+    :param sort_index: Optional precomputed column sort index, used instead of sorting the columns.
+    :return: Estimated mutual information.
+    """
+    # Validate input
+    if not isinstance(data, np.ndarray) or data.ndim != 2 or data.shape[1] != 2:
+        raise ValueError("Input 'data' must be a 2D numpy array with shape (n_samples, 2).")
+    if not 0 < alpha < 1:
+        raise ValueError("'alpha' must be in the open interval (0, 1).")
+
+    n_samples = data.shape[0]
+    orders = [sort_index["order"][:, var_idx] if sort_index is not None else None for var_idx in range(2)]
+    ranks_x = rank_transform(data[:, 0], orders[0])
+    ranks_y = rank_transform(data[:, 1], orders[1])
+    threshold = chi2.ppf(1 - alpha, df=3)
+
+    # Active cells as half-open rank ranges, and the cell of every point that is still active
+    x_lo = np.array([0])
+    x_hi = np.array([n_samples])
+    y_lo = np.array([0])
+    y_hi = np.array([n_samples])
+    cell = np.zeros(n_samples, dtype=np.intp)
+
+    mi = 0.0
+    level = 0
+    while cell.shape[0] > 0:
+        n_cells = x_lo.shape[0]
+        x_mid = (x_lo + x_hi) // 2
+        y_mid = (y_lo + y_hi) // 2
+
+        # Quadrant of every active point (0..3 = 2 * upper_x + upper_y) and counts per cell
+        quadrant = 2 * (ranks_x >= x_mid[cell]) + (ranks_y >= y_mid[cell])
+        counts = np.bincount(4 * cell + quadrant, minlength=4 * n_cells).reshape(n_cells, 4)
+        cell_counts = counts.sum(axis=1)
+
+        # Chi-square test of equiprobable subcells; cells one rank wide cannot be split further
+        expected = cell_counts / 4
+        statistic = np.sum((counts - expected[:, None]) ** 2, axis=1) / expected
+        splittable = (x_hi - x_lo >= 2) & (y_hi - y_lo >= 2)
+        split = splittable & ((statistic > threshold) if level > 0 else True)
+
+        # Terminal cells contribute (n_c / N) log(n_c N / (n_x n_y)), with n_x, n_y the rank widths
+        terminal = ~split
+        n_c = cell_counts[terminal]
+        width_x = x_hi[terminal] - x_lo[terminal]
+        width_y = y_hi[terminal] - y_lo[terminal]
+        mi += np.sum(n_c / n_samples * np.log(n_c * n_samples / (width_x * width_y)))
+
+        # Children of the split cells, dropping the empty ones
+        child_counts = counts[split]
+        keep = child_counts > 0
+        new_cell_id = np.full((n_cells, 4), -1, dtype=np.intp)
+        new_cell_id[split] = np.where(keep, np.cumsum(keep).reshape(keep.shape) - 1, -1)
+
+        parent, child_quadrant = np.nonzero(keep)
+        parent = np.flatnonzero(split)[parent]
+        upper_x = child_quadrant // 2 == 1
+        upper_y = child_quadrant % 2 == 1
+        x_lo, x_hi = np.where(upper_x, x_mid[parent], x_lo[parent]), np.where(upper_x, x_hi[parent], x_mid[parent])
+        y_lo, y_hi = np.where(upper_y, y_mid[parent], y_lo[parent]), np.where(upper_y, y_hi[parent], y_mid[parent])
+
+        # Points of the split cells move to their child cell, the others leave the active set
+        active = split[cell]
+        ranks_x = ranks_x[active]
+        ranks_y = ranks_y[active]
+        cell = new_cell_id[cell[active], quadrant[active]]
+        level += 1
+
+    return mi
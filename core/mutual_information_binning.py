@@ -6,6 +6,88 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../u
 from decorators import time_it
 
 
+def uniform_bin_codes(x, num_bins):
+    """
+    Map a 1D variable to the integer codes of num_bins equal-width bins spanning [min, max].
+
+    :param x: 1D array of values.
+    :param num_bins: Number of bins.
+    :return: Integer array of bin codes in [0, num_bins - 1]; the maximum falls in the last bin.
+    """
+    x_min, x_max = np.min(x), np.max(x)
+    if x_max == x_min:
+        return np.zeros(x.shape[0], dtype=np.intp)
+    codes = ((x - x_min) * (num_bins / (x_max - x_min))).astype(np.intp)
+    np.minimum(codes, num_bins - 1, out=codes)
+    return codes
+
+
+def quantile_bin_codes(x, num_bins, order=None, sorted_x=None):
+    """
+    Map a 1D variable to the integer codes of num_bins equal-frequency (quantile) bins, with the
+    same edges and bin assignment as KBinsDiscretizer(strategy='quantile').
+
+    :param x: 1D array of values.
+    :param num_bins: Number of bins.
+    :param order: Optional argsort permutation of x (e.g. from a precomputed sort index).
+    :param sorted_x: Optional sorted values of x, required together with order.
+    :return: Integer array of bin codes in [0, num_bins - 1].
+    """
+    quantiles = np.linspace(0, 1, num_bins + 1)
+    if order is None or sorted_x is None:
+        edges = np.quantile(x, quantiles, method='averaged_inverted_cdf')
+        return np.searchsorted(edges[1:-1], x, side='right')
+
+    # With the sort index the codes follow from where the inner edges fall in the sorted values
+    edges = np.quantile(sorted_x, quantiles, method='averaged_inverted_cdf')
+    bounds = np.searchsorted(sorted_x, edges[1:-1], side='left')
+    bin_sizes = np.diff(np.concatenate(([0], bounds, [sorted_x.shape[0]])))
+    codes = np.empty(sorted_x.shape[0], dtype=np.intp)
+    codes[order] = np.repeat(np.arange(num_bins, dtype=np.intp), bin_sizes)
+    return codes
+
+
+def joint_bin_counts(codes_x, codes_y, num_bins_x, num_bins_y=None):
+    """
+    Build the joint histogram of two integer-coded variables with a single bincount.
+
+    :param codes_x: Integer bin codes of X in [0, num_bins_x - 1].
+    :param codes_y: Integer bin codes of Y in [0, num_bins_y - 1].
+    :param num_bins_x: Number of bins of X.
+    :param num_bins_y: Number of bins of Y (defaults to num_bins_x).
+    :return: 2D array of shape (num_bins_x, num_bins_y) with the joint counts.
+    """
+    if num_bins_y is None:
+        num_bins_y = num_bins_x
+    flat_codes = codes_x * num_bins_y + codes_y
+    return np.bincount(flat_codes, minlength=num_bins_x * num_bins_y).reshape(num_bins_x, num_bins_y)
+
+
+def mutual_information_from_counts(joint_counts, first_order_correction=False):
+    """
+    Mutual information of a joint histogram.
+
+    :param joint_counts: 2D array of joint counts.
+    :param first_order_correction: If True, subtract 1/(2N) from every joint probability
+        (clipping at zero) before evaluating the plug-in formula.
+    :return: Estimated mutual information.
+    """
+    joint_counts = np.asarray(joint_counts, dtype=float)
+    n_samples = joint_counts.sum()
+    joint_prob = joint_counts / n_samples
+
+    p_x = joint_prob.sum(axis=1)  # Marginal distribution of X
+    p_y = joint_prob.sum(axis=0)  # Marginal distribution of Y
+
+    if first_order_correction:
+        joint_prob = joint_prob - 1 / (2 * n_samples)
+
+    # Only occupied cells contribute
+    rows, cols = np.nonzero(joint_prob > 0)
+    p_xy = joint_prob[rows, cols]
+    return np.sum(p_xy * np.log(p_xy / (p_x[rows] * p_y[cols])))
+
+
 @time_it
 def mutual_information_binning(data, num_bins):
     """
@@ -22,75 +104,111 @@ def mutual_information_binning(data, num_bins):
         raise ValueError("'num_bins' must be a positive integer.")
 
     # Rimuovere campioni con valori mancanti o infiniti
-    data = data[~np.any(np.isnan(data) | np.isinf(data), axis=1)]
+    data = data[np.all(np.isfinite(data), axis=1)]
     if data.shape[0] == 0:
         raise ValueError("No valid data points remain after removing NaN or Inf values.")
 
-    # Estrazione delle variabili
-    x, y = data[:, 0], data[:, 1]
-
-    # Creazione dei bin
-    x_bins = np.linspace(np.min(x), np.max(x), num_bins + 1)
-    y_bins = np.linspace(np.min(y), np.max(y), num_bins + 1)
+    # Equal-width bin codes of each variable, then the joint distribution with one bincount
+    codes_x = uniform_bin_codes(data[:, 0], num_bins)
+    codes_y = uniform_bin_codes(data[:, 1], num_bins)
+    joint_counts = joint_bin_counts(codes_x, codes_y, num_bins)
 
-    # Calcolo della distribuzione congiunta
-    joint_hist, _, _ = np.histogram2d(x, y, bins=[x_bins, y_bins])
-    joint_prob = joint_hist / np.sum(joint_hist)  # Normalizzazione
-
-    # Distribuzioni marginali
-    p_x = np.sum(joint_prob, axis=1, keepdims=True)  # Marginale di X
-    p_y = np.sum(joint_prob, axis=0, keepdims=True)  # Marginale di Y
-
-    # Evitare divisioni per zero
-    valid_bins = joint_prob > 0  # Considera solo i bin con probabilità > 0
-
-    # Calcolo della mutua informazione (vettorializzata)
-    mi = np.sum(
-        joint_prob[valid_bins] * 
-        np.log(joint_prob[valid_bins] / (p_x[valid_bins.sum(axis=1), :] * p_y[:, valid_bins.sum(axis=0)]))
-    )
-
-    return mi
+    return mutual_information_from_counts(joint_counts)
 
 
 @time_it
-def mutual_information_binningadaptive(data, num_bins):
+def mutual_information_binningadaptive(data, num_bins, sort_index=None):
     """
     Estimate mutual information using adaptive binning and first-order correction.
 
     :param data: 2D array of shape (n_samples, 2), where each row is a sample (x, y).
     :param num_bins: Target number of bins for each variable.
+    :param sort_index: Optional precomputed column sort index (see io_utils.load_sort_index); when
+        given, the quantile codes are read off the sorted columns.
     :return: Estimated mutual information with adaptive binning and corrections.
     """
-    from sklearn.preprocessing import KBinsDiscretizer
-
     # Validate input
     if not isinstance(data, np.ndarray) or data.ndim != 2 or data.shape[1] != 2:
         raise ValueError("Input 'data' must be a 2D numpy array with shape (n_samples, 2).")
     if not isinstance(num_bins, int) or num_bins <= 0:
         raise ValueError("'num_bins' must be a positive integer.")
-    
-    # Adaptive binning using quantile strategy
-    discretizer = KBinsDiscretizer(n_bins=num_bins, encode='ordinal', strategy='quantile')
-    binned_data = discretizer.fit_transform(data)
-
-    # Joint and marginal frequencies
-    joint_hist, _, _ = np.histogram2d(binned_data[:, 0], binned_data[:, 1], bins=[num_bins, num_bins])
-    joint_prob = joint_hist / np.sum(joint_hist)  # Normalize to joint probabilities
-
-    p_x = np.sum(joint_prob, axis=1, keepdims=True)  # Marginal distribution of X
-    p_y = np.sum(joint_prob, axis=0, keepdims=True)  # Marginal distribution of Y
-
-    # Apply first-order correction for finite sample size
-    N = data.shape[0]  # Number of samples
-    joint_prob_corrected = joint_prob - 1 / (2 * N)
-    joint_prob_corrected[joint_prob_corrected < 0] = 0  # Avoid negative probabilities
-
-    # Mutual information calculation (vectorized)
-    valid_bins = joint_prob > 0  # Consider only bins with probability > 0
-    mi = np.sum(
-        joint_prob_corrected[valid_bins] *
-        np.log(joint_prob_corrected[valid_bins] / (p_x[valid_bins.sum(axis=1), :] * p_y[:, valid_bins.sum(axis=0)]))
-    )
-
-    return mi
\ No newline at end of file
+
+    # Adaptive binning using quantile strategy, directly as integer codes
+    codes = []
+    for var_idx in range(2):
+        if sort_index is not None:
+            codes.append(quantile_bin_codes(data[:, var_idx], num_bins,
+                                            order=sort_index["order"][:, var_idx],
+                                            sorted_x=sort_index["sorted"][:, var_idx]))
+        else:
+            codes.append(quantile_bin_codes(data[:, var_idx], num_bins))
+
+    # Joint frequencies with a single bincount, first-order correction for finite sample size
+    joint_counts = joint_bin_counts(codes[0], codes[1], num_bins)
+
+    return mutual_information_from_counts(joint_counts, first_order_correction=True)
+
+
+def rank_transform(x, order=None):
+    """
+    Ranks 0..n-1 of a 1D variable (ties are broken by position).
+
+    :param x: 1D array of values.
+    :param order: Optional argsort permutation of x (e.g. from a precomputed sort index).
+    :return: Integer array with the rank of each value.
+    """
+    if order is None:
+        order = np.argsort(x, kind='stable')
+    ranks = np.empty(x.shape[0], dtype=np.intp)
+    ranks[order] = np.arange(x.shape[0], dtype=np.intp)
+    return ranks
+
+
+@time_it
+def mutual_information_binning_sweep(data, bin_counts, sort_index=None, first_order_correction=True,
+                                     max_batch_size=2**24):
+    """
+    Estimate mutual information with adaptive (equal-frequency) binning for several bin counts at once.
+
+    Each column is rank-transformed once; the codes for num_bins bins are rank * num_bins // N, and
+    the joint tables of all resolutions are built with one bincount per batch of resolutions.
+    For data without ties the bins coincide with quantile bins up to the placement of the edges.
+
+    :param data: 2D array of shape (n_samples, 2), where each row is a sample (x, y).
+    :param bin_counts: Sequence of numbers of bins for each variable.
+    :param sort_index: Optional precomputed column sort index, used instead of sorting the columns.
+    :param first_order_correction: Apply the first-order correction of mutual_information_binningadaptive.
+    :param max_batch_size: Maximum number of codes (n_samples times resolutions) held in memory at once.
+    :return: 1D array with the estimated mutual information for each bin count.
+    """
+    # Validate input
+    if not isinstance(data, np.ndarray) or data.ndim != 2 or data.shape[1] != 2:
+        raise ValueError("Input 'data' must be a 2D numpy array with shape (n_samples, 2).")
+    bin_counts = np.asarray(bin_counts, dtype=np.intp)
+    if bin_counts.ndim != 1 or bin_counts.size == 0 or np.any(bin_counts <= 0):
+        raise ValueError("'bin_counts' must be a non-empty sequence of positive integers.")
+
+    n_samples = data.shape[0]
+    orders = [sort_index["order"][:, var_idx] if sort_index is not None else None for var_idx in range(2)]
+    ranks_x = rank_transform(data[:, 0], orders[0])
+    ranks_y = rank_transform(data[:, 1], orders[1])
+
+    mi_values = np.empty(bin_counts.shape[0])
+    batch_length = max(1, max_batch_size // n_samples)
+    for start in range(0, bin_counts.shape[0], batch_length):
+        batch = bin_counts[start:start + batch_length]
+
+        # Codes of every resolution in the batch, shifted so that the tables occupy disjoint ranges
+        table_sizes = batch * batch
+        offsets = np.concatenate(([0], np.cumsum(table_sizes)[:-1]))
+        codes_x = (ranks_x[None, :] * batch[:, None]) // n_samples
+        codes_y = (ranks_y[None, :] * batch[:, None]) // n_samples
+        flat_codes = offsets[:, None] + codes_x * batch[:, None] + codes_y
+
+        counts = np.bincount(flat_codes.ravel(), minlength=int(table_sizes.sum()))
+        for j, num_bins in enumerate(batch):
+            joint_counts = counts[offsets[j]:offsets[j] + table_sizes[j]].reshape(num_bins, num_bins)
+            mi_values[start + j] = mutual_information_from_counts(
+                joint_counts, first_order_correction=first_order_correction)
+
+    return mi_values
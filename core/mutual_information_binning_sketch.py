@@ -0,0 +1,235 @@
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+from decorators import time_it
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from mutual_information_binning import joint_bin_counts, mutual_information_from_counts
+
+
+def _valid_rows(chunk):
+    """Validate a chunk of samples and drop the rows containing NaN or Inf values."""
+    chunk = np.asarray(chunk, dtype=float)
+    if chunk.ndim != 2 or chunk.shape[1] != 2:
+        raise ValueError("Each chunk must be a 2D array with shape (n_samples, 2).")
+    return chunk[np.all(np.isfinite(chunk), axis=1)]
+
+
+class JointHistogramSketch:
+    """
+    Joint histogram of two variables with fixed bin edges, accumulated chunk by chunk.
+
+    Sketches with the same edges can be merged, so shards of a dataset can be histogrammed by
+    different workers and combined before computing the mutual information. Values outside the
+    edges are counted in the first or last bin.
+    """
+
+    def __init__(self, x_edges, y_edges):
+        """
+        :param x_edges: Increasing bin edges of X (num_bins_x + 1 values).
+        :param y_edges: Increasing bin edges of Y (num_bins_y + 1 values).
+        """
+        self.x_edges = np.asarray(x_edges, dtype=float)
+        self.y_edges = np.asarray(y_edges, dtype=float)
+        if self.x_edges.ndim != 1 or self.y_edges.ndim != 1 or self.x_edges.size < 2 or self.y_edges.size < 2:
+            raise ValueError("Bin edges must be 1D arrays with at least two values.")
+        self.counts = np.zeros((self.x_edges.size - 1, self.y_edges.size - 1), dtype=np.int64)
+
+    @classmethod
+    def uniform(cls, x_range, y_range, num_bins):
+        """
+        Sketch with num_bins equal-width bins per variable over the given (min, max) ranges.
+        """
+        return cls(np.linspace(x_range[0], x_range[1], num_bins + 1),
+                   np.linspace(y_range[0], y_range[1], num_bins + 1))
+
+    def update(self, chunk):
+        """
+        Add a chunk of samples of shape (n_samples, 2) to the joint counts.
+
+        :return: The sketch itself.
+        """
+        chunk = _valid_rows(chunk)
+        codes_x = np.searchsorted(self.x_edges[1:-1], chunk[:, 0], side='right')
+        codes_y = np.searchsorted(self.y_edges[1:-1], chunk[:, 1], side='right')
+        self.counts += joint_bin_counts(codes_x, codes_y, self.counts.shape[0], self.counts.shape[1])
+        return self
+
+    def merge(self, other):
+        """
+        Add the counts of another sketch with the same edges.
+
+        :return: The sketch itself.
+        """
+        if not (np.array_equal(self.x_edges, other.x_edges) and np.array_equal(self.y_edges, other.y_edges)):
+            raise ValueError("Only sketches with identical bin edges can be merged.")
+        self.counts += other.counts
+        return self
+
+    @property
+    def n_samples(self):
+        return int(self.counts.sum())
+
+    def mutual_information(self, first_order_correction=False):
+        """
+        Mutual information of the accumulated joint histogram.
+        """
+        if self.n_samples == 0:
+            raise ValueError("The sketch does not contain any sample.")
+        return mutual_information_from_counts(self.counts, first_order_correction=first_order_correction)
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile summary of a 1D variable (a compactor hierarchy in the style
+    of KLL sketches).
+
+    Items at level h stand for 2**h samples. When a level holds more than `capacity` items it is
+    sorted and every other item (with a random offset) is promoted to the next level, so the
+    memory stays O(capacity * log(n / capacity)) and the rank error O(1 / capacity) up to
+    logarithmic factors. The exact minimum and maximum are tracked separately.
+    """
+
+    def __init__(self, capacity=2048, seed=None):
+        """
+        :param capacity: Maximum number of items per level before compaction.
+        :param seed: Seed for the random offsets of the compactions.
+        """
+        if capacity < 2:
+            raise ValueError("'capacity' must be at least 2.")
+        self.capacity = capacity
+        self.levels = [np.empty(0)]
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """
+        Add a 1D array of values to the sketch.
+
+        :return: The sketch itself.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return self
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Add the content of another quantile sketch.
+
+        :return: The sketch itself.
+        """
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self.capacity:
+                items = np.sort(items)
+                # An odd item stays at this level so that the total weight is preserved exactly
+                keep = items[-1:] if items.size % 2 else items[:0]
+                paired = items[:items.size - keep.size]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+            h += 1
+
+    @property
+    def n_samples(self):
+        return int(sum(items.size * 2**h for h, items in enumerate(self.levels)))
+
+    def quantiles(self, probabilities):
+        """
+        Approximate quantiles of the values added so far.
+
+        :param probabilities: Probabilities in [0, 1]; 0 and 1 return the exact minimum and maximum.
+        :return: Array of quantiles.
+        """
+        if self.n_samples == 0:
+            raise ValueError("The sketch does not contain any sample.")
+        probabilities = np.asarray(probabilities, dtype=float)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0**h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        positions = np.searchsorted(cumulative, probabilities * cumulative[-1], side='left')
+        result = items[np.minimum(positions, items.size - 1)]
+        result = np.where(probabilities <= 0, self.min, result)
+        return np.where(probabilities >= 1, self.max, result)
+
+
+def joint_sketch_from_marginals(x_sketch, y_sketch, num_bins, strategy='quantile'):
+    """
+    Empty joint histogram sketch whose edges are derived from the marginal quantile sketches.
+
+    :param x_sketch: QuantileSketch of X.
+    :param y_sketch: QuantileSketch of Y.
+    :param num_bins: Number of bins for each variable.
+    :param strategy: 'quantile' for equal-frequency edges, 'uniform' for equal-width edges.
+    :return: JointHistogramSketch.
+    """
+    if strategy == 'quantile':
+        probabilities = np.linspace(0, 1, num_bins + 1)
+        return JointHistogramSketch(x_sketch.quantiles(probabilities), y_sketch.quantiles(probabilities))
+    return JointHistogramSketch.uniform((x_sketch.min, x_sketch.max), (y_sketch.min, y_sketch.max), num_bins)
+
+
+@time_it
+def mutual_information_binning_chunked(chunk_source, num_bins, strategy='quantile', capacity=2048, seed=None):
+    """
+    Estimate mutual information by binning data that is only available chunk by chunk, in
+    memory independent of the total number of samples.
+
+    A first pass builds mergeable quantile sketches of the two variables, which give the bin
+    edges (quantile edges for strategy 'quantile', the exact range for 'uniform'); a second pass
+    accumulates the joint histogram with those edges. The 'quantile' strategy applies the
+    first-order correction of mutual_information_binningadaptive.
+
+    :param chunk_source: Callable returning a fresh iterable of chunks of shape (n_samples, 2).
+    :param num_bins: Number of bins for each variable.
+    :param strategy: 'quantile' (adaptive binning) or 'uniform' (equal-width binning).
+    :param capacity: Capacity of the quantile sketches.
+    :param seed: Seed for the quantile sketches, from which each sketch derives its own stream.
+    :return: Estimated mutual information.
+    """
+    if strategy not in ('quantile', 'uniform'):
+        raise ValueError("'strategy' must be 'quantile' or 'uniform'.")
+    if not isinstance(num_bins, int) or num_bins <= 0:
+        raise ValueError("'num_bins' must be a positive integer.")
+
+    # First pass: marginal sketches, with independent compaction streams
+    x_seed, y_seed = np.random.SeedSequence(seed).spawn(2)
+    x_sketch = QuantileSketch(capacity=capacity, seed=x_seed)
+    y_sketch = QuantileSketch(capacity=capacity, seed=y_seed)
+    for chunk in chunk_source():
+        chunk = _valid_rows(chunk)
+        x_sketch.update(chunk[:, 0])
+        y_sketch.update(chunk[:, 1])
+
+    joint_sketch = joint_sketch_from_marginals(x_sketch, y_sketch, num_bins, strategy)
+
+    # Second pass: joint counts with the fixed edges
+    for chunk in chunk_source():
+        joint_sketch.update(chunk)
+
+    return joint_sketch.mutual_information(first_order_correction=(strategy == 'quantile'))
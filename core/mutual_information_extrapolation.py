@@ -0,0 +1,117 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+from decorators import time_it
+
+
+def nested_subsample_sizes(n_samples, n_levels=5, min_size=100):
+    """
+    Compute the sizes of the nested subsamples N, N/2, N/4, ... used for the finite-size extrapolation.
+
+    Parameters:
+        n_samples (int): Number of samples in the full dataset.
+        n_levels (int): Maximum number of halving levels (the full sample counts as the first level).
+        min_size (int): Smallest subsample size that is still evaluated.
+
+    Returns:
+        list[int]: Subsample sizes in decreasing order.
+    """
+    sizes = []
+    n_blocks = 1
+    while len(sizes) < n_levels and n_samples // n_blocks >= min_size:
+        sizes.append(n_samples // n_blocks)
+        n_blocks *= 2
+    return sizes
+
+
+def shuffled_finite_sample(data, seed=None):
+    """
+    Drop the rows with non-finite values and shuffle the remaining rows, the preprocessing of the
+    finite-size extrapolation. Doing it once lets several estimators share the same sample and blocks.
+
+    Parameters:
+        data (2D array-like): Data matrix where each row is a sample and each column is a variable.
+        seed (int, optional): Seed for the shuffling of the samples.
+
+    Returns:
+        np.ndarray: The cleaned and shuffled sample.
+    """
+    data = np.asarray(data, dtype=float)
+    if data.ndim != 2:
+        raise ValueError("Input 'data' must be a 2D array with shape (n_samples, n_variables).")
+    data = data[np.all(np.isfinite(data), axis=1)]
+    rng = np.random.default_rng(seed)
+    return data[rng.permutation(data.shape[0])]
+
+
+@time_it
+def mutual_information_extrapolated(data, mi_estimate, n_levels=5, min_size=100, fit_order=1,
+                                    max_blocks=None, seed=None, shuffled=False, **estimator_kwargs):
+    """
+    Estimate the N -> infinity limit of the mutual information from a single large sample.
+
+    The sample is cleaned and shuffled once; at level m it is split into 2^m disjoint blocks of
+    size N/2^m, which are contiguous views of the shuffled array, and the estimator is averaged
+    over the blocks. The averages are fitted with a polynomial in 1/N whose intercept is the
+    extrapolated mutual information.
+
+    Parameters:
+        data (2D array-like): Data matrix where each row is a sample and each column is a variable.
+        mi_estimate (callable): Estimator called as mi_estimate(block, **estimator_kwargs).
+        n_levels (int): Maximum number of halving levels.
+        min_size (int): Smallest block size that is still evaluated.
+        fit_order (int): Degree of the polynomial in 1/N used to model the bias.
+        max_blocks (int, optional): Maximum number of blocks evaluated per level.
+        seed (int, optional): Seed for the shuffling of the samples.
+        shuffled (bool): If True, data is already cleaned and shuffled (see shuffled_finite_sample)
+            and is used as is; seed is then ignored.
+        **estimator_kwargs: Parameters forwarded to the estimator (e.g. k or num_bins).
+
+    Returns:
+        dict: Subsample sizes, number of blocks, mean and standard deviation of the estimate at
+        each level, fit coefficients (highest order first) and the extrapolated value.
+    """
+    # Shared preprocessing: drop invalid rows and shuffle once, so every level only takes views
+    if shuffled:
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2:
+            raise ValueError("Input 'data' must be a 2D array with shape (n_samples, n_variables).")
+    else:
+        data = shuffled_finite_sample(data, seed=seed)
+
+    sizes = nested_subsample_sizes(data.shape[0], n_levels=n_levels, min_size=min_size)
+    if len(sizes) <= fit_order:
+        raise ValueError(
+            f"At least {fit_order + 1} subsample levels are needed for a fit of order {fit_order}, "
+            f"got {len(sizes)} (n_samples={data.shape[0]}, min_size={min_size})."
+        )
+
+    n_blocks = []
+    mi_mean = []
+    mi_std = []
+    for size in sizes:
+        blocks = data.shape[0] // size
+        if max_blocks is not None:
+            blocks = min(blocks, max_blocks)
+        values = np.array([
+            mi_estimate(data[i * size:(i + 1) * size], **estimator_kwargs)
+            for i in range(blocks)
+        ])
+        n_blocks.append(blocks)
+        mi_mean.append(np.mean(values))
+        mi_std.append(np.std(values))
+
+    # Every level averages the same total number of samples, so the level means have comparable
+    # variances and an unweighted fit is appropriate
+    coefficients = np.polyfit(1.0 / np.array(sizes), np.array(mi_mean), fit_order)
+
+    return {
+        "sizes": np.array(sizes),
+        "n_blocks": np.array(n_blocks),
+        "mi_mean": np.array(mi_mean),
+        "mi_std": np.array(mi_std),
+        "coefficients": coefficients,
+        "mi_extrapolated": coefficients[-1],
+    }
@@ -1,112 +1,199 @@
 import os
 import sys
+import json
+import zlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 
 # Import helper modules from utils
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
 from math_utils import *
 from config_utils import load_config
+from io_utils import save_sort_index, write_data_file, data_file_extension, write_bundle, member_path, \
+    split_member_path, BUNDLE_FILE_NAMES
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'sampling')))
 from multivariate_generator import *
 
 
-def generate_and_save_data(config, selected_distribution_name, selected_size=None, all_sizes=False, num_files=20):
+def replicate_file_paths(output_dir, distribution, size, num_files, file_format="txt"):
+    """
+    Directory and file paths of the replicates of a distribution and size in the data tree:
+    <output_dir>/<name>[/corr_<correlation>]/<params>/size_<size>/<NN>.<file_format>
+    With a bundle format ("bundle" or "compressed_bundle") the paths are the references
+    <size_dir>/replicates.<npy|npz>#<NN> to the replicates of the bundle.
+
+    The directories are not created; the paths also identify the replicates of the fused
+    generate-and-analyze pipeline, which may not write them.
+    """
+    dist_dir = os.path.join(output_dir, distribution['name'])
+
+    # Handle correlated_gaussian_rv: a subdirectory for the correlation value
+    if distribution['name'] == "correlated_gaussian_rv":
+        correlation = distribution.get('correlation', 0)  # Retrieve the correlation from the config
+        dist_dir = os.path.join(dist_dir, f"corr_{correlation:.2f}")
+
+    # Directory for parameter values, then for the size
+    param_values = "_".join([f"{key}_{val}" for key, val in distribution['params'].items()])
+    size_dir = os.path.join(dist_dir, param_values, f"size_{size}")
+
+    if file_format in BUNDLE_FILE_NAMES:
+        bundle_path = os.path.join(size_dir, BUNDLE_FILE_NAMES[file_format])
+        return size_dir, [member_path(bundle_path, file_num) for file_num in range(1, num_files + 1)]
+
+    # Simplified file names (e.g., "01.txt", "02.txt")
+    extension = data_file_extension(file_format)
+    file_paths = [
+        os.path.join(size_dir, f"{file_num:02d}{extension}")
+        for file_num in range(1, num_files + 1)
+    ]
+    return size_dir, file_paths
+
+
+def config_seed(config):
+    """
+    Root seed of the random streams: the "seed" of the config, or fresh entropy (printed, so that the
+    run can be reproduced by adding it to the config) when the config has none.
+    """
+    seed = config.get('seed')
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        print(f"[INFO] No seed in the config; using seed {seed}.")
+    return seed
+
+
+def replicate_seed_sequence(seed, distribution, size, file_num):
+    """
+    Independent random stream of one replicate, a child of the root seed addressed by the distribution
+    entry (its content, so reordering the config does not change it), the size and the file number.
+    Every replicate therefore gets the same data whichever process generates it and in whichever order.
+
+    :param seed: Root seed (see config_seed).
+    :param distribution: Distribution entry of the config.
+    :param size: Number of samples.
+    :param file_num: Number of the replicate, starting at 1.
+    :return: np.random.SeedSequence.
+    """
+    distribution_key = zlib.crc32(json.dumps(distribution, sort_keys=True).encode())
+    return np.random.SeedSequence(seed, spawn_key=(distribution_key, int(size), int(file_num)))
+
+
+def generate_replicate(task, write_sort_index=False, out=None):
+    """
+    Generate one replicate from its own random stream and write it (the task run by each worker).
+
+    :param task: Tuple (distribution entry, size, file path, seed sequence).
+    :param write_sort_index: If True, also write the sort index sidecar of the file.
+    :param out: Optional (size, 2) buffer the replicate is drawn into, e.g. its slot of a bundle.
+    :return: The data of a replicate of a bundle (written by the caller with the other replicates),
+             None otherwise.
+    """
+    distribution, size, file_path, seed_sequence = task
+    data = sample_distribution(distribution, size, np.random.default_rng(seed_sequence), out=out)
+    if split_member_path(file_path)[1] is not None:
+        return data
+
+    # Save data as binary .npy, or as text without headers and with high precision
+    write_data_file(file_path, data)
+
+    # Optional sidecar with the column sort index, built from the saved (rounded) values
+    if write_sort_index:
+        save_sort_index(file_path)
+    return None
+
+
+def generate_and_save_data(config, selected_distribution_name, selected_size=None, all_sizes=False, num_files=20,
+                           max_workers=None):
+    """
+    Generate the replicates of a distribution for one or all sizes of the config and write them.
+
+    The replicates are generated in parallel by a process pool; each one draws from its own child
+    stream of the "seed" of the config, so the files are bit-identical whatever the number of workers.
+
+    :param config: Loaded configuration.
+    :param selected_distribution_name: Name of the distribution to generate.
+    :param selected_size: Size to generate (unless all_sizes).
+    :param all_sizes: If True, generate all the sizes of the config.
+    :param num_files: Number of replicates per size.
+    :param max_workers: Number of worker processes (defaults to the number of CPUs; 1 runs in this process).
+    """
     output_dir = config.get('output_dir', 'data/synthetic_data')
+    write_sort_index = config.get('write_sort_index', False)
+    file_format = config.get('file_format', 'txt')
 
     # Find the selected distribution in the config
     distribution = next((d for d in config['distributions'] if d['name'] == selected_distribution_name), None)
     if not distribution:
         raise ValueError(f"Distribution {selected_distribution_name} not found in config.")
-
-    # General parameters
-    params = distribution['params']
+    if distribution['name'] not in DISTRIBUTION_BATCH_SAMPLERS:
+        raise ValueError(f"Unsupported distribution: {distribution['name']}")
 
     # Retrieve global sizes from the config
     sizes_to_generate = config['sizes'] if all_sizes else [selected_size]
+    seed = config_seed(config)
 
-    for size in sizes_to_generate:
-        # Create the main directory if it does not exist
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        # Create a subdirectory for the selected distribution
-        dist_dir = os.path.join(output_dir, selected_distribution_name)
-        if not os.path.exists(dist_dir):
-            os.makedirs(dist_dir)
-            
-        #Handle correlated_gaussian_rv: Create a subdirectory for the correlation value
-        if selected_distribution_name == "correlated_gaussian_rv":
-            correlation = distribution.get('correlation', 0)  # Retrieve the correlation from the config
-            corr_dir = os.path.join(dist_dir, f"corr_{correlation:.2f}")
-            if not os.path.exists(corr_dir):
-                os.makedirs(corr_dir)
-        else:
-            corr_dir = dist_dir  # Use the distribution directory for other cases    
-            
-            
-        # Add a directory for parameter values
-        param_values = "_".join([f"{key}_{val}" for key, val in params.items()])
-        param_dir = os.path.join(corr_dir, param_values)
-        if not os.path.exists(param_dir):
-            os.makedirs(param_dir)    
-           
-           
-        # Create a specific subdirectory for the size
-        size_dir = os.path.join(param_dir, f"size_{size}")
-        if not os.path.exists(size_dir):
-            os.makedirs(size_dir)
-
-        # Prepare file paths with simplified names (e.g., "01.txt", "02.txt")
-        file_paths = [
-            os.path.join(size_dir, f"{file_num:02d}.txt")
-            for file_num in range(1, num_files + 1)
-        ]
-        
-        # Check if any file already exists
-        existing_files = [file_path for file_path in file_paths if os.path.exists(file_path)]
-        if existing_files:
-            print(f"\n{len(existing_files)} files already exist for this configuration (size {size}).")
-            overwrite = None
-            while overwrite not in ['y', 'n']:
-                overwrite = input(f"Do you want to overwrite these files for size {size}? (y/n): ").strip().lower()
-            if overwrite == 'n':
-                print(f"Skipping generation for size {size}.")
+    # Worker processes, each drawing the replicates it receives from their own streams
+    max_workers = max_workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    generate = partial(generate_replicate, write_sort_index=write_sort_index)
+
+    try:
+        for size in sizes_to_generate:
+            # Create the directory tree of the distribution, parameters and size
+            size_dir, file_paths = replicate_file_paths(output_dir, distribution, size, num_files, file_format)
+            os.makedirs(size_dir, exist_ok=True)
+
+            # Check if any file (or the bundle) already exists
+            if file_format in BUNDLE_FILE_NAMES:
+                bundle_path = split_member_path(file_paths[0])[0]
+                existing_files = [bundle_path] if os.path.exists(bundle_path) else []
+            else:
+                existing_files = [file_path for file_path in file_paths if os.path.exists(file_path)]
+            if existing_files:
+                print(f"\n{len(existing_files)} files already exist for this configuration (size {size}).")
+                overwrite = None
+                while overwrite not in ['y', 'n']:
+                    overwrite = input(f"Do you want to overwrite these files for size {size}? (y/n): ").strip().lower()
+                if overwrite == 'n':
+                    print(f"Skipping generation for size {size}.")
+                    continue
+
+            # Generate data: one task per replicate, with its own PCG64 stream
+            tasks = [
+                (distribution, size, file_path, replicate_seed_sequence(seed, distribution, size, file_num))
+                for file_num, file_path in enumerate(file_paths, start=1)
+            ]
+
+            if file_format in BUNDLE_FILE_NAMES:
+                # All replicates in one array, drawn in place or copied from the workers into their slots
+                replicates = np.empty((num_files, size, 2))
+                if executor is None:
+                    for task, slot in zip(tasks, replicates):
+                        generate(task, out=slot)
+                else:
+                    for slot, data in zip(replicates, executor.map(generate, tasks)):
+                        slot[...] = data
+                write_bundle(bundle_path, replicates)
+                print(f"{num_files} replicates generated and saved in: {bundle_path}")
+                if write_sort_index:
+                    save_sort_index(bundle_path, replicates)
                 continue
-        
-        # Creation of a generator's instance based on PCG64 
-        rng = np.random.default_rng()  # Use PCG64 as PRNG
-
-        # Dictionary to map distributions to their respective generation functions
-        distribution_functions = {
-            "independent_gaussian_rv": lambda params, size: independent_gaussian_rv(params['mu'], params['sigma'], size, rng),
-            "correlated_gaussian_rv": lambda params, size: correlated_gaussian_rv(params['mu'], params['sigma'], distribution['correlation'], size, rng),
-            "independent_uniform_rv": lambda params, size: independent_uniform_rv(params['low'], params['high'], size, rng),
-            "independent_exponential_rv": lambda params, size: independent_exponential_rv(params['lambda'], size, rng),
-            "gamma_exponential": lambda params, size: gamma_exponential(params['theta'], size, rng),
-            "ordered_wienman_exponential": lambda params, size: ordered_wienman_exponential(params['theta'], size, rng),
-            "circular": lambda params, size: circular(params['a'], params['b'], params['c'], size, rng),
-        }
-
-        # Retrieve the generation function
-        generate_function = distribution_functions.get(distribution['name'])
-        if not generate_function:
-            raise ValueError(f"Unsupported distribution: {distribution['name']}")
-
-        # Generate data
-        for file_num, output_file in enumerate(file_paths, start=1):
-            data = generate_function(params, size)
-
-            # Save data to a TXT file without headers and with high precision
-            np.savetxt(output_file, data, fmt="%.15e")
-            print(f"File {file_num}/{num_files} generated and saved in: {output_file}")
 
+            results = map(generate, tasks) if executor is None else executor.map(generate, tasks)
+            for file_num, (output_file, _) in enumerate(zip(file_paths, results), start=1):
+                print(f"File {file_num}/{num_files} generated and saved in: {output_file}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Generate synthetic data for a selected distribution.")
     parser.add_argument("config_file", type=str, help="Path to the configuration file (JSON).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (defaults to the number of CPUs).")
     args = parser.parse_args()
 
     # Load configuration
@@ -169,7 +256,8 @@ if __name__ == "__main__":
                 config=config,
                 selected_distribution_name=selected_distribution['name'],
                 all_sizes=True,
-                num_files=num_files
+                num_files=num_files,
+                max_workers=args.workers
             )
         else:
             # Generate data for a specific size
@@ -205,7 +293,8 @@ if __name__ == "__main__":
                 config=config,
                 selected_distribution_name=selected_distribution['name'],
                 selected_size=selected_size,
-                num_files=num_files
+                num_files=num_files,
+                max_workers=args.workers
             )
 
         # Ask if the user wants to generate more data or exit
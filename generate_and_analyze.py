@@ -0,0 +1,265 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+
+# Import helper modules from utils
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
+from config_utils import load_config
+from io_utils import write_data_file, BUNDLE_FILE_NAMES
+from scheduling_utils import estimate_task_memory, available_memory, limit_nested_parallelism, run_scheduled, \
+    WORKER_BASE_MEMORY
+from results_store import ResultsStore
+from mutual_information_utils import analyze_file_into_tree, create_summary_csvs_from_store, extract_file_details, \
+    MI_ESTIMATORS, DEFAULT_MI_ESTIMATORS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'sampling')))
+from multivariate_generator import sample_distribution, DISTRIBUTION_BATCH_SAMPLERS
+from data_generator import replicate_file_paths, config_seed, replicate_seed_sequence
+
+
+def generate_and_analyze_replicate(task, mi_values_dir, save_data=False, **table_options):
+    """
+    Generate one replicate in memory and compute its MI table (the task run by each worker).
+
+    :param task: Tuple (distribution entry, size, file path, seed sequence); the path is where data_generator.py
+                 would write the replicate (in the file format of the config) and identifies its group, and
+                 the seed sequence is the replicate's stream, so the data equal those of data_generator.py.
+    :param mi_values_dir: Root of the mi_values tree.
+    :param save_data: If True, also write the replicate to its path as data_generator.py does.
+    :param table_options: Options forwarded to process_and_save_mi_table.
+    :return: Output of analyze_file_into_tree, or None on failure.
+    """
+    distribution, size, file_path, seed_sequence = task
+    try:
+        data = sample_distribution(distribution, size, np.random.default_rng(seed_sequence))
+        if save_data:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            write_data_file(file_path, data)
+        return analyze_file_into_tree(file_path, mi_values_dir, data=data, **table_options)
+    except Exception as e:
+        print(f"[ERROR] Failed to generate and analyze {file_path}: {e}")
+        return None
+
+
+def _replicate_group(file_path):
+    """(distribution, params, size) group of a replicate path in the results store."""
+    details = extract_file_details(file_path)
+    return details["distribution_name"], details["params"], details["size"]
+
+
+def generate_and_analyze(config, output_dir, distribution_names=None, sizes=None, num_files=20, save_data=False,
+                         num_bins=10, estimators=DEFAULT_MI_ESTIMATORS, k_values=range(1, 31), max_workers=None,
+                         max_in_flight=None, memory_budget=None, write_file_csvs=False, target_sem=None,
+                         min_files=5, max_files=200):
+    """
+    Generate synthetic replicates and estimate their mutual information in the same worker processes,
+    without writing and re-parsing the data files. Only the MI results are stored, in the results store
+    and summary CSVs of analyze_and_save_mi_values. With the same "seed" in the config, the replicates
+    are identical to those written by data_generator.py.
+
+    With a target_sem the number of replicates is chosen per distribution and size: replicates are
+    generated in rounds until the largest standard error of the mean MI (over k and estimators) of the
+    group falls below the target or max_files is reached. After a first round of min_files replicates,
+    each round adds the replicates that the current standard error predicts to be missing
+    (SEM ~ 1/sqrt(n)), so the compute goes to the configurations with the largest variance.
+
+    :param config: Loaded configuration (distributions, sizes and output_dir of the data tree).
+    :param output_dir: Directory of the mi_values tree and of the results store.
+    :param distribution_names: Names of the distributions to generate (defaults to all of the config).
+    :param sizes: Sample sizes to generate (defaults to the sizes of the config).
+    :param num_files: Number of replicates per distribution and size (without target_sem).
+    :param save_data: If True, also write the replicates into the data tree of the config.
+    :param num_bins: Number of bins for the adaptive binning MI calculation.
+    :param estimators: Names of the MI_ESTIMATORS to evaluate.
+    :param k_values: Numbers of nearest neighbors of the sweep.
+    :param max_workers: Number of worker processes (defaults to the number of CPUs; 1 runs in this process).
+    :param max_in_flight: Maximum number of replicates submitted but not finished (defaults to twice max_workers).
+    :param memory_budget: Memory in bytes allowed to the replicates processed at once.
+    :param write_file_csvs: If True, also write one CSV per replicate into the mi_values tree.
+    :param target_sem: Target standard error of the mean MI; None generates num_files replicates per size.
+    :param min_files: Replicates of the first round of the adaptive mode.
+    :param max_files: Maximum number of replicates per distribution and size in the adaptive mode.
+    """
+    distributions = [
+        distribution for distribution in config['distributions']
+        if distribution_names is None or distribution['name'] in distribution_names
+    ]
+    if not distributions:
+        print("[INFO] No distributions selected. Exiting.")
+        return
+    unsupported = [d['name'] for d in distributions if d['name'] not in DISTRIBUTION_BATCH_SAMPLERS]
+    if unsupported:
+        raise ValueError(f"Unsupported distributions: {unsupported}")
+    if target_sem is not None and not 2 <= min_files <= max_files:
+        raise ValueError("'min_files' and 'max_files' must satisfy 2 <= min_files <= max_files.")
+    sizes = config['sizes'] if sizes is None else sizes
+    data_dir = config.get('output_dir', 'data/synthetic_data')
+    file_format = config.get('file_format', 'txt')
+    seed = config_seed(config)
+    if save_data and file_format in BUNDLE_FILE_NAMES:
+        raise ValueError("The workers write one file per replicate; generate bundles with data_generator.py.")
+
+    mi_values_dir = os.path.join(output_dir, "mi_values")
+    os.makedirs(mi_values_dir, exist_ok=True)
+    results_store_path = os.path.join(output_dir, "mi_results.sqlite")
+    ResultsStore(results_store_path).close()  # created before the workers open it concurrently
+
+    task = partial(generate_and_analyze_replicate, mi_values_dir=mi_values_dir, save_data=save_data,
+                   num_bins=num_bins, estimators=estimators, k_values=k_values,
+                   results_store_path=results_store_path, write_csv=write_file_csvs)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * max_workers
+    if memory_budget is None:
+        memory_budget = max(0, int(0.8 * available_memory()) - max_workers * WORKER_BASE_MEMORY)
+    k_max = max(k_values)
+
+    def run_round(executor, tasks):
+        # One task per replicate, identified by the path data_generator.py would give it
+        print(f"[INFO] {len(tasks)} replicates to generate and analyze.")
+        if executor is None:
+            for replicate in tasks:
+                task(replicate)
+            return
+        for (distribution, size, file_path, _), result in run_scheduled(
+                executor, task, tasks, max_in_flight,
+                memory_of=lambda replicate: estimate_task_memory(replicate[1], k_max),
+                memory_budget=memory_budget):
+            if result is None:
+                print(f"[ERROR] No results for replicate {file_path}")
+
+    def replicate_task(distribution, size, file_path):
+        # Same stream as the replicate of data_generator.py with the same path and seed
+        file_num = int(extract_file_details(file_path)["file_index"])
+        return distribution, size, file_path, replicate_seed_sequence(seed, distribution, size, file_num)
+
+    executor = None
+    if max_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=limit_nested_parallelism)
+    try:
+        if target_sem is None:
+            run_round(executor, [
+                replicate_task(distribution, size, file_path)
+                for distribution in distributions
+                for size in sizes
+                for file_path in replicate_file_paths(data_dir, distribution, size, num_files, file_format)[1]
+            ])
+        else:
+            def replicate_paths(index, size, count):
+                return replicate_file_paths(data_dir, distributions[index], size, count, file_format)[1]
+
+            # Replicates requested per (distribution, size); groups leave once converged or at max_files
+            pending = {
+                (index, size): min_files for index in range(len(distributions)) for size in sizes
+            }
+            while pending:
+                tasks = []
+                with ResultsStore(results_store_path) as store:
+                    for (index, size), requested in pending.items():
+                        # Replicates without a result for some estimator or k of this run, wherever they are
+                        file_paths = replicate_paths(index, size, requested)
+                        done = store.completed_replicates(*_replicate_group(file_paths[0]), estimators, k_values)
+                        tasks.extend(replicate_task(distributions[index], size, path) for path in file_paths
+                                     if extract_file_details(path)["file_index"] not in done)
+                run_round(executor, tasks)
+
+                with ResultsStore(results_store_path) as store:
+                    for (index, size), requested in list(pending.items()):
+                        group = _replicate_group(replicate_paths(index, size, 1)[0])
+                        count = store.replicate_count(*group, estimators, k_values)
+                        sem = store.max_standard_error(*group, estimators, k_values)
+                        if sem <= target_sem or count >= max_files or count < requested:
+                            # Converged, at the cap, or replicates failing: stop this group
+                            print(f"[INFO] {'/'.join(group)}: {count} replicates, standard error {sem:.3g}.")
+                            del pending[(index, size)]
+                        else:
+                            needed = int(np.ceil(count * (sem / target_sem) ** 2))
+                            pending[(index, size)] = min(max_files, max(needed, count + 1))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    create_summary_csvs_from_store(results_store_path, mi_values_dir)
+    print(f"[INFO] Analysis completed. Results saved in: {mi_values_dir}")
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic replicates and compute their mutual information in one pass, "
+                    "without a round-trip through data files."
+    )
+    parser.add_argument("config_file", help="Path to the configuration file (JSON).")
+    parser.add_argument("--output-dir", required=True, help="Directory where the mi_values tree is written.")
+    parser.add_argument("--distributions", nargs="+", default=None,
+                        help="Distributions to generate (defaults to all distributions of the config).")
+    parser.add_argument("--sizes", nargs="+", type=int, default=None,
+                        help="Sample sizes to generate (defaults to the sizes of the config).")
+    parser.add_argument("--num-files", type=int, default=20, help="Number of replicates per distribution and size.")
+    parser.add_argument("--target-sem", type=float, default=None,
+                        help="Generate replicates until the standard error of the mean MI falls below this value "
+                             "(instead of --num-files per size).")
+    parser.add_argument("--min-files", type=int, default=5, help="Replicates of the first round with --target-sem.")
+    parser.add_argument("--max-files", type=int, default=200,
+                        help="Maximum number of replicates per distribution and size with --target-sem.")
+    parser.add_argument("--save-data", action="store_true",
+                        help="Also write the replicates into the data tree of the config.")
+    parser.add_argument("--estimators", nargs="+", default=list(DEFAULT_MI_ESTIMATORS),
+                        choices=sorted(MI_ESTIMATORS), help="Estimators to evaluate.")
+    parser.add_argument("--k-min", type=int, default=1, help="Smallest number of nearest neighbors.")
+    parser.add_argument("--k-max", type=int, default=30, help="Largest number of nearest neighbors.")
+    parser.add_argument("--num-bins", type=int, default=10, help="Number of bins for the binning estimator.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (defaults to the number of CPUs).")
+    parser.add_argument("--memory-budget-gb", type=float, default=None,
+                        help="Memory allowed to the replicates processed at once (defaults to 80%% of the available memory).")
+    parser.add_argument("--write-file-csvs", action="store_true",
+                        help="Also write one CSV per replicate into the mi_values tree.")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.k_min <= args.k_max:
+        parser.error("--k-min and --k-max must satisfy 1 <= k-min <= k-max.")
+    if args.num_files <= 0:
+        parser.error("--num-files must be a positive integer.")
+    if args.target_sem is not None and args.target_sem <= 0:
+        parser.error("--target-sem must be positive.")
+    if not 2 <= args.min_files <= args.max_files:
+        parser.error("--min-files and --max-files must satisfy 2 <= min-files <= max-files.")
+    if args.memory_budget_gb is not None and args.memory_budget_gb <= 0:
+        parser.error("--memory-budget-gb must be positive.")
+    return args
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    try:
+        config = load_config(args.config_file)
+    except Exception as e:
+        print(f"Error loading configuration file: {e}")
+        sys.exit(1)
+
+    generate_and_analyze(
+        config=config,
+        output_dir=args.output_dir,
+        distribution_names=args.distributions,
+        sizes=args.sizes,
+        num_files=args.num_files,
+        save_data=args.save_data,
+        num_bins=args.num_bins,
+        estimators=args.estimators,
+        k_values=range(args.k_min, args.k_max + 1),
+        max_workers=args.workers,
+        memory_budget=None if args.memory_budget_gb is None else int(args.memory_budget_gb * 1024**3),
+        write_file_csvs=args.write_file_csvs,
+        target_sem=args.target_sem,
+        min_files=args.min_files,
+        max_files=args.max_files,
+    )
+
+
+# Entry point of the script
+if __name__ == "__main__":
+    main()
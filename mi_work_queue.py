@@ -0,0 +1,99 @@
+import os
+import sys
+import argparse
+from multiprocessing import Process
+
+# Import helper modules from utils
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
+from interface_utils import discover_files
+from io_utils import DATA_FILE_SUFFIXES
+from mutual_information_utils import MI_ESTIMATORS, DEFAULT_MI_ESTIMATORS
+from work_queue_utils import publish_tasks, run_worker, collect_results, queue_status
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute mutual information through a work queue in a shared directory: publish the tasks "
+                    "once, start workers on any number of nodes mounting the directory, then collect the results."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    publish = subparsers.add_parser("publish", help="Publish one task per file, estimator and chunk of k values.")
+    publish.add_argument("queue_dir", help="Queue directory on the shared filesystem.")
+    publish.add_argument("inputs", nargs="+",
+                         help="Data files, directories (scanned recursively), glob patterns or manifest files "
+                              "(@file forces a manifest).")
+    publish.add_argument("--estimators", nargs="+", default=list(DEFAULT_MI_ESTIMATORS),
+                         choices=sorted(MI_ESTIMATORS), help="Estimators to evaluate.")
+    publish.add_argument("--k-min", type=int, default=1, help="Smallest number of nearest neighbors.")
+    publish.add_argument("--k-max", type=int, default=30, help="Largest number of nearest neighbors.")
+    publish.add_argument("--k-chunk-size", type=int, default=10, help="Number of k values per task.")
+    publish.add_argument("--num-bins", type=int, default=10, help="Number of bins for the binning estimator.")
+    publish.add_argument("--extension", nargs="+", default=list(DATA_FILE_SUFFIXES),
+                         help="Extensions (or name endings) of the data files and bundles.")
+
+    work = subparsers.add_parser("work", help="Execute tasks until the queue is drained.")
+    work.add_argument("queue_dir", help="Queue directory on the shared filesystem.")
+    work.add_argument("--local-workers", type=int, default=1, help="Number of worker processes on this node.")
+    work.add_argument("--lease-timeout", type=float, default=600,
+                      help="Seconds without heartbeat after which a claimed task is returned to the queue.")
+    work.add_argument("--poll-interval", type=float, default=5,
+                      help="Seconds between polls while other workers still hold tasks.")
+    work.add_argument("--max-attempts", type=int, default=3, help="Maximum number of claims of a task.")
+    work.add_argument("--keep-polling", action="store_true",
+                      help="Keep waiting for new tasks instead of exiting when the queue is drained.")
+
+    collect = subparsers.add_parser("collect", help="Move the finished results into a results store.")
+    collect.add_argument("queue_dir", help="Queue directory on the shared filesystem.")
+    collect.add_argument("--output-dir", required=True,
+                         help="Directory of the results store and of the mi_values tree of summaries.")
+
+    status = subparsers.add_parser("status", help="Print the number of tasks in each state.")
+    status.add_argument("queue_dir", help="Queue directory on the shared filesystem.")
+
+    args = parser.parse_args(argv)
+    if args.command == "publish":
+        if not 1 <= args.k_min <= args.k_max:
+            parser.error("--k-min and --k-max must satisfy 1 <= k-min <= k-max.")
+        if args.k_chunk_size <= 0 or args.num_bins <= 0:
+            parser.error("--k-chunk-size and --num-bins must be positive integers.")
+    if args.command == "work" and (args.local_workers <= 0 or args.lease_timeout <= 0):
+        parser.error("--local-workers and --lease-timeout must be positive.")
+    return args
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    if args.command == "publish":
+        selected_files = discover_files(args.inputs, file_extension=tuple(args.extension))
+        published = publish_tasks(args.queue_dir, selected_files, args.estimators,
+                                  range(args.k_min, args.k_max + 1), num_bins=args.num_bins,
+                                  k_chunk_size=args.k_chunk_size)
+        print(f"[INFO] {published} tasks published for {len(selected_files)} files.")
+
+    elif args.command == "work":
+        worker_options = dict(lease_timeout=args.lease_timeout, poll_interval=args.poll_interval,
+                              max_attempts=args.max_attempts, exit_when_idle=not args.keep_polling)
+        workers = [Process(target=run_worker, args=(args.queue_dir,), kwargs=worker_options)
+                   for _ in range(args.local_workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        print(f"[INFO] Workers finished: {queue_status(args.queue_dir)}")
+
+    elif args.command == "collect":
+        os.makedirs(args.output_dir, exist_ok=True)
+        collected = collect_results(args.queue_dir, os.path.join(args.output_dir, "mi_results.sqlite"),
+                                    mi_values_dir=os.path.join(args.output_dir, "mi_values"))
+        print(f"[INFO] {collected} results collected.")
+
+    elif args.command == "status":
+        print(queue_status(args.queue_dir))
+
+
+# Entry point of the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import argparse
+
+# Import helper modules from utils
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
+from interface_utils import discover_files
+from io_utils import DATA_FILE_SUFFIXES
+from catalog_utils import DatasetCatalog
+from mutual_information_utils import analyze_and_save_mi_values, MI_ESTIMATORS, DEFAULT_MI_ESTIMATORS
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute mutual information for a batch of data files without interactive selection."
+    )
+    parser.add_argument("inputs", nargs="*",
+                        help="Data files, directories (scanned recursively), glob patterns or manifest files "
+                             "(@file forces a manifest); "
+                             "with --catalog, directories to refresh in the catalog and to select files from.")
+    parser.add_argument("--output-dir", required=True, help="Directory where the mi_values tree is written.")
+    parser.add_argument("--estimators", nargs="+", default=list(DEFAULT_MI_ESTIMATORS),
+                        choices=sorted(MI_ESTIMATORS), help="Estimators to evaluate.")
+    parser.add_argument("--k-min", type=int, default=1, help="Smallest number of nearest neighbors.")
+    parser.add_argument("--k-max", type=int, default=30, help="Largest number of nearest neighbors.")
+    parser.add_argument("--num-bins", type=int, default=10, help="Number of bins for the binning estimator.")
+    parser.add_argument("--catalog", default=None,
+                        help="Dataset catalog (SQLite) used to select the files instead of walking directories.")
+    parser.add_argument("--where", default=None,
+                        help="SQL condition on the catalog columns (distribution, params, size, file_index, "
+                             "file_size, mtime_ns, n_rows, checksum), e.g. \"n_rows >= 1000\".")
+    parser.add_argument("--no-refresh", action="store_true",
+                        help="Select from the catalog as it is, without crawling the input directories.")
+    parser.add_argument("--extension", nargs="+", default=list(DATA_FILE_SUFFIXES),
+                        help="Extensions (or name endings) of the data files and bundles.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (defaults to the number of CPUs).")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum number of files submitted to the workers at once (defaults to 2x workers).")
+    parser.add_argument("--prefetch-depth", type=int, default=0,
+                        help="Send the files to the workers in chunks; each worker loads up to this many files "
+                             "of its chunk ahead while it estimates (0: one file per task, no read-ahead).")
+    parser.add_argument("--memory-budget-gb", type=float, default=None,
+                        help="Memory allowed to the files processed at once (defaults to 80%% of the available memory).")
+    parser.add_argument("--cache", default=None,
+                        help="Result cache file (defaults to mi_cache.sqlite in the output directory).")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every result without using the cache.")
+    parser.add_argument("--cache-max-entries", type=int, default=1_000_000,
+                        help="Maximum number of results kept in the cache (least recently used are evicted).")
+    parser.add_argument("--results-store", default=None,
+                        help="Results database (defaults to mi_results.sqlite in the output directory).")
+    parser.add_argument("--write-file-csvs", action="store_true",
+                        help="Also write one CSV per data file into the mi_values tree.")
+    parser.add_argument("--build-sort-index", action="store_true",
+                        help="Write the column sort index sidecars that are missing or stale.")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and args.catalog is None:
+        parser.error("at least one input is required without --catalog.")
+    if args.where is not None and args.catalog is None:
+        parser.error("--where requires --catalog.")
+    if not 1 <= args.k_min <= args.k_max:
+        parser.error("--k-min and --k-max must satisfy 1 <= k-min <= k-max.")
+    if args.num_bins <= 0:
+        parser.error("--num-bins must be a positive integer.")
+    if args.prefetch_depth < 0:
+        parser.error("--prefetch-depth must not be negative.")
+    if args.memory_budget_gb is not None and args.memory_budget_gb <= 0:
+        parser.error("--memory-budget-gb must be positive.")
+    if args.cache_max_entries <= 0:
+        parser.error("--cache-max-entries must be a positive integer.")
+    return args
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    if args.catalog is None:
+        selected_files = discover_files(args.inputs, file_extension=tuple(args.extension))
+    else:
+        with DatasetCatalog(args.catalog) as catalog:
+            roots = [os.path.abspath(root) for root in args.inputs]
+            for root in roots:
+                if not os.path.isdir(root):
+                    print(f"[ERROR] Not a directory: {root}")
+                    sys.exit(1)
+                if not args.no_refresh:
+                    refreshed = catalog.refresh(root, file_extension=tuple(args.extension))
+                    print(f"[INFO] Catalog refreshed for {root}: {refreshed}")
+            selected_files = [
+                path for path in catalog.select(where=args.where)
+                if not roots or any(path.startswith(root + os.sep) for root in roots)
+            ]
+    print(f"[INFO] {len(selected_files)} files selected for analysis.")
+    if not selected_files:
+        sys.exit(1)
+
+    analyze_and_save_mi_values(
+        input_dir=None,
+        output_dir=args.output_dir,
+        num_bins=args.num_bins,
+        selected_files=selected_files,
+        estimators=args.estimators,
+        k_values=range(args.k_min, args.k_max + 1),
+        build_sort_index=args.build_sort_index,
+        max_workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        prefetch_depth=args.prefetch_depth,
+        results_store_path=args.results_store,
+        write_file_csvs=args.write_file_csvs,
+        use_cache=not args.no_cache,
+        cache_path=args.cache,
+        cache_max_entries=args.cache_max_entries,
+        memory_budget=None if args.memory_budget_gb is None else int(args.memory_budget_gb * 1024**3),
+    )
+
+
+# Entry point of the script
+if __name__ == "__main__":
+    main()
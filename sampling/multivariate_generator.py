@@ -93,4 +93,135 @@ def ordered_wienman_exponential(theta, size, rng):
     combined_array = np.column_stack((x, y))
 
     return combined_array
-    
+
+
+# Batched variants: each fills a preallocated C-contiguous float64 buffer `out` of shape
+# (n_files, size, 2) with n_files replicates. The whole buffer is filled by one standard draw and
+# then transformed in place, without stacking copies and with at most one temporary column.
+
+def independent_gaussian_rv_batch(mu, sigma, out, rng):
+    rng.standard_normal(out=out)
+    out *= sigma
+    out += mu
+    return out
+
+def correlated_gaussian_rv_batch(mu, sigma, corr, out, rng):
+    # As correlate_data: (x0, x1) -> (x0, corr * x0 + sqrt(1 - corr^2) * x1), applied in place
+    if not -1 <= corr <= 1:
+        raise ValueError(f"The correlation must be between -1 and 1, got {corr}.")
+    independent_gaussian_rv_batch(mu, sigma, out, rng)
+    x0, x1 = out[..., 0], out[..., 1]
+    if corr == 0:
+        return out
+    x1 *= np.sqrt(1 - corr ** 2) / corr
+    x1 += x0
+    x1 *= corr
+    return out
+
+def independent_uniform_rv_batch(low, high, out, rng):
+    rng.random(out=out)
+    out *= high - low
+    out += low
+    return out
+
+def independent_exponential_rv_batch(lam, out, rng):
+    rng.standard_exponential(out=out)
+    out *= 1 / lam
+    return out
+
+def gamma_exponential_batch(theta, out, rng):
+    # Y | X ~ Exp(rate X): a standard exponential divided by X. Gamma variates need a contiguous
+    # buffer, so X is the only temporary (half of out)
+    rng.standard_exponential(out=out)
+    out[..., 0] = rng.standard_gamma(theta, size=out.shape[:-1])
+    np.divide(out[..., 1], out[..., 0], out=out[..., 1])
+    return out
+
+def ordered_wienman_exponential_batch(theta, out, rng):
+    # X ~ Exp(scale 1/2), Y = X + Z with Z ~ Exp(scale theta)
+    rng.standard_exponential(out=out)
+    out[..., 0] *= 0.5
+    out[..., 1] *= theta
+    out[..., 1] += out[..., 0]
+    return out
+
+def circular_batch(a, b, c, out, rng):
+    rng.random(out=out)
+    r, phi = out[..., 0], out[..., 1]
+
+    # R from the triangular density by inverse transform of the uniform variates: both branches are
+    # evaluated (the second one in the only temporary) and merged, which is faster than masked ufuncs.
+    # Values of a branch outside its interval may be NaN; they are discarded
+    upper = r > (b - a) / (c - a)
+    with np.errstate(invalid='ignore'):
+        r_upper = np.subtract(1, r)
+        r_upper *= (c - a) * (c - b)
+        np.sqrt(r_upper, out=r_upper)
+        np.subtract(c, r_upper, out=r_upper)
+        r *= (c - a) * (b - a)
+        np.sqrt(r, out=r)
+    r += a
+    np.copyto(r, r_upper, where=upper)
+
+    # (X, Y) = R exp(i Phi): the pairs (log R, Phi) are read as complex numbers and exponentiated in place
+    phi *= 2 * np.pi
+    with np.errstate(divide='ignore'):
+        np.log(r, out=r)  # R = 0 gives -inf, and exp(-inf + i Phi) = 0
+    pairs = out.view(np.complex128)
+    np.exp(pairs, out=pairs)
+    return out
+
+
+# Generation functions of the distributions of config.json, called with the distribution entry of the
+# config (name, params and, for the correlated Gaussian, the correlation), the output buffer and the generator
+DISTRIBUTION_BATCH_SAMPLERS = {
+    "independent_gaussian_rv": lambda dist, out, rng: independent_gaussian_rv_batch(dist['params']['mu'], dist['params']['sigma'], out, rng),
+    "correlated_gaussian_rv": lambda dist, out, rng: correlated_gaussian_rv_batch(dist['params']['mu'], dist['params']['sigma'], dist['correlation'], out, rng),
+    "independent_uniform_rv": lambda dist, out, rng: independent_uniform_rv_batch(dist['params']['low'], dist['params']['high'], out, rng),
+    "independent_exponential_rv": lambda dist, out, rng: independent_exponential_rv_batch(dist['params']['lambda'], out, rng),
+    "gamma_exponential": lambda dist, out, rng: gamma_exponential_batch(dist['params']['theta'], out, rng),
+    "ordered_wienman_exponential": lambda dist, out, rng: ordered_wienman_exponential_batch(dist['params']['theta'], out, rng),
+    "circular": lambda dist, out, rng: circular_batch(dist['params']['a'], dist['params']['b'], dist['params']['c'], out, rng),
+}
+
+
+def sample_distribution_batch(distribution, n_files, size, rng, out=None):
+    """
+    Draw n_files datasets of shape (size, 2) from a distribution entry of the configuration in one
+    vectorized call, written into a preallocated buffer.
+
+    :param distribution: Distribution entry of config.json ('name', 'params' and, if needed, 'correlation').
+    :param n_files: Number of replicates.
+    :param size: Number of samples per replicate.
+    :param rng: NumPy random generator.
+    :param out: Optional C-contiguous float64 array of shape (n_files, size, 2) to fill.
+    :return: Array of shape (n_files, size, 2) (out, if given).
+    """
+    sampler = DISTRIBUTION_BATCH_SAMPLERS.get(distribution['name'])
+    if sampler is None:
+        raise ValueError(f"Unsupported distribution: {distribution['name']}")
+    if out is None:
+        out = np.empty((n_files, size, 2))
+    elif out.shape != (n_files, size, 2) or out.dtype != np.float64 or not out.flags.c_contiguous:
+        raise ValueError(f"'out' must be a C-contiguous float64 array of shape {(n_files, size, 2)}.")
+    return sampler(distribution, out, rng)
+
+
+def sample_distribution(distribution, size, rng, out=None):
+    """
+    Draw a dataset of shape (size, 2) from a distribution entry of the configuration.
+
+    The entry is a plain dictionary, so it can be sent to worker processes that generate the data
+    themselves.
+
+    :param distribution: Distribution entry of config.json ('name', 'params' and, if needed, 'correlation').
+    :param size: Number of samples.
+    :param rng: NumPy random generator.
+    :param out: Optional C-contiguous float64 array of shape (size, 2) to fill.
+    :return: Array of shape (size, 2) (out, if given).
+    """
+    if out is None:
+        out = np.empty((size, 2))
+    sample_distribution_batch(distribution, 1, size, rng, out=out[np.newaxis])
+    return out
+
@@ -0,0 +1,51 @@
+import math
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+import mutual_information_utils
+from cache_utils import ResultCache, data_content_hash, result_key
+
+
+def test_round_trip_and_miss(tmp_path):
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        cache.put("a", 0.25)
+        cache.put("b", float("nan"))
+        assert cache.get("a") == 0.25
+        assert math.isnan(cache.get("b"))
+        assert cache.get("c") is None
+
+
+def test_least_recently_used_are_evicted(tmp_path):
+    with ResultCache(str(tmp_path / "cache.sqlite"), max_entries=2) as cache:
+        for key in ("a", "b", "c"):
+            cache.put(key, 1.0)
+        cache.get("a")
+        assert cache.evict() == 1
+        assert cache.get("b") is None and cache.get("a") == 1.0 and cache.get("c") == 1.0
+
+
+def test_content_hash_ignores_the_memory_layout():
+    data = np.arange(6.0).reshape(3, 2)
+    assert data_content_hash(data) == data_content_hash(np.asfortranarray(data))
+    assert data_content_hash(data) != data_content_hash(data.T)
+    assert result_key("h", "mi_1", 1, {"k": 3}) != result_key("h", "mi_1", 2, {"k": 3})
+
+
+def test_cached_nan_estimate_is_not_recomputed(tmp_path, monkeypatch):
+    calls = []
+
+    def degenerate_estimate(data, k):
+        calls.append(k)
+        return float("nan")
+
+    monkeypatch.setitem(mutual_information_utils.MI_ESTIMATORS, "degenerate",
+                        {"function": degenerate_estimate, "params": ("k",), "uses_sort_index": False, "version": 1})
+    data = np.zeros((10, 2))
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        for _ in range(2):
+            value = mutual_information_utils.memoized_estimate({}, "degenerate", data, {"k": 3}, cache=cache,
+                                                               data_hash=data_content_hash(data))
+            assert math.isnan(value)
+    assert calls == [3]
@@ -0,0 +1,29 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from catalog_utils import DatasetCatalog
+from io_utils import write_bundle, member_path
+
+
+def test_incremental_refresh(tmp_path):
+    size_dir = tmp_path / "data" / "gauss" / "size_20"
+    size_dir.mkdir(parents=True)
+    rng = np.random.default_rng(0)
+    np.save(size_dir / "01.npy", rng.standard_normal((20, 2)))
+    np.savetxt(size_dir / "02.txt", rng.standard_normal((20, 2)))
+    (size_dir / ".hidden.txt").write_text("1 2\n")
+    bundle_path = str(tmp_path / "data" / "gauss" / "replicates.npy")
+    write_bundle(bundle_path, rng.standard_normal((2, 20, 2)))
+
+    with DatasetCatalog(str(tmp_path / "catalog.sqlite")) as catalog:
+        root = str(tmp_path / "data")
+        assert catalog.refresh(root) == {"added": 4, "updated": 0, "removed": 0, "unchanged": 0}
+        assert catalog.refresh(root) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 4}
+        assert member_path(bundle_path, 2) in catalog.select()
+
+        os.remove(size_dir / "02.txt")
+        assert catalog.refresh(root)["removed"] == 1
+        assert catalog.select(n_rows=20) == sorted([str(size_dir / "01.npy"), member_path(bundle_path, 1),
+                                                    member_path(bundle_path, 2)])
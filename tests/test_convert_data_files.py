@@ -0,0 +1,29 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from convert_data_files import convert_data_file
+from io_utils import load_data, write_data_file
+
+
+def test_npy_to_txt_to_npy_round_trip(tmp_path):
+    data = np.random.default_rng(0).standard_normal((500, 2)) * np.logspace(-300, 300, 500)[:, np.newaxis]
+    npy_path = str(tmp_path / "01.npy")
+    write_data_file(npy_path, data)
+
+    assert convert_data_file(npy_path, "txt", remove_source=True) == "converted"
+    assert not os.path.exists(npy_path)
+    assert np.array_equal(load_data(str(tmp_path / "01.txt")), data)
+
+    assert convert_data_file(str(tmp_path / "01.txt"), "npy") == "converted"
+    assert np.array_equal(load_data(npy_path), data)
+
+
+def test_existing_target_is_skipped(tmp_path):
+    data = np.arange(6.0).reshape(3, 2)
+    write_data_file(str(tmp_path / "01.npy"), data)
+    write_data_file(str(tmp_path / "01.txt"), data)
+
+    assert convert_data_file(str(tmp_path / "01.npy"), "txt") == "skipped"
@@ -0,0 +1,44 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from interface_utils import discover_files, is_manifest_file
+
+
+def _write_data_files(directory, names):
+    paths = []
+    for name in names:
+        path = os.path.join(directory, name)
+        np.savetxt(path, np.arange(6.0).reshape(3, 2), fmt="%.15e")
+        paths.append(path)
+    return paths
+
+
+def test_txt_manifest_is_resolved(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    first, second = _write_data_files(str(data_dir), ["01.txt", "02.txt"])
+    manifest = tmp_path / "files.txt"
+    manifest.write_text("# selection\ndata/01.txt\n\ndata/02.txt  # second file\n")
+
+    assert is_manifest_file(str(manifest))
+    assert discover_files([str(manifest)]) == [first, second]
+
+
+def test_txt_data_file_is_not_a_manifest(tmp_path):
+    (data_file,) = _write_data_files(str(tmp_path), ["01.txt"])
+    commented = tmp_path / "02.txt"
+    commented.write_text("# x y\n1.0,2.0\n3.0,4.0\n")
+
+    assert not is_manifest_file(data_file)
+    assert not is_manifest_file(str(commented))
+    assert discover_files([data_file, str(commented)]) == [data_file, str(commented)]
+
+
+def test_at_prefix_forces_manifest(tmp_path):
+    (data_file,) = _write_data_files(str(tmp_path), ["01.txt"])
+    manifest = tmp_path / "list.lst"
+    manifest.write_text("01.txt\n")
+
+    assert discover_files(["@" + str(manifest)]) == [data_file]
@@ -0,0 +1,55 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from io_utils import load_data, save_sort_index, load_sort_index, write_bundle, member_path
+
+
+@pytest.mark.parametrize("text", ["1.5 2\n3 4\n", "1.5,2\n3,4\n", "1.5\t2\n3\t4\n", "# x y\n1.5  2\n3 4\n"])
+def test_text_delimiters(tmp_path, text):
+    file_path = tmp_path / "01.txt"
+    file_path.write_text(text)
+    assert np.array_equal(load_data(str(file_path)), [[1.5, 2], [3, 4]])
+
+
+def test_ragged_text_file_is_rejected(tmp_path):
+    file_path = tmp_path / "01.txt"
+    file_path.write_text("1 2\n3 4 5\n6\n")
+    with pytest.raises(ValueError):
+        load_data(str(file_path))
+
+
+def test_sort_index_round_trip(tmp_path):
+    data = np.random.default_rng(0).standard_normal((50, 2))
+    file_path = str(tmp_path / "01.npy")
+    np.save(file_path, data)
+    save_sort_index(file_path)
+    sort_index = load_sort_index(file_path, data_shape=data.shape)
+    assert np.array_equal(sort_index["sorted"], np.sort(data, axis=0))
+
+
+def test_sort_index_of_bundle_replicates(tmp_path):
+    replicates = np.random.default_rng(0).standard_normal((3, 50, 2))
+    bundle_path = str(tmp_path / "replicates.npy")
+    write_bundle(bundle_path, replicates)
+    save_sort_index(member_path(bundle_path, 2))
+    assert sorted(os.listdir(tmp_path)) == ["replicates.npy", "replicates.npy.sortidx.npz"]
+    for file_num in (1, 2, 3):
+        sort_index = load_sort_index(member_path(bundle_path, file_num), data_shape=(50, 2))
+        assert np.array_equal(sort_index["sorted"], np.sort(replicates[file_num - 1], axis=0))
+
+
+def test_rewrite_with_same_size_and_mtime_invalidates_sort_index(tmp_path):
+    rng = np.random.default_rng(0)
+    file_path = str(tmp_path / "01.npy")
+    np.save(file_path, rng.standard_normal((50, 2)))
+    save_sort_index(file_path)
+    stat = os.stat(file_path)
+
+    # In-place rewrite within one tick of a coarse modification time
+    np.save(file_path, rng.standard_normal((50, 2)))
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(file_path).st_size == stat.st_size
+    assert load_sort_index(file_path) is None
@@ -0,0 +1,37 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from results_store import ResultsStore
+
+GROUP = ("gauss", "mu_0", "100")
+
+
+def _add(store, file_index, estimators, k_values, value=0.5):
+    details = {"distribution_name": GROUP[0], "params": GROUP[1], "size": GROUP[2], "file_index": file_index}
+    store.add_table(details, [["k"] + list(estimators)] + [[k] + [value + k] * len(estimators) for k in k_values])
+
+
+def test_summary_from_running_statistics(tmp_path):
+    with ResultsStore(str(tmp_path / "results.sqlite")) as store:
+        _add(store, "01", ["mi_1"], [1, 2], value=0.0)
+        _add(store, "02", ["mi_1"], [1, 2], value=1.0)
+        summary = store.summary(*GROUP)
+        assert summary["mean_mi_1"].tolist() == [1.5, 2.5]
+        assert summary["sigma_mi_1"].tolist() == [0.5, 0.5]
+
+
+def test_replicates_are_counted_for_the_requested_results(tmp_path):
+    with ResultsStore(str(tmp_path / "results.sqlite")) as store:
+        for file_index in ("01", "02", "04"):
+            _add(store, file_index, ["mi_1"], [1, 2])
+        _add(store, "03", ["mi_1", "mi_kde"], [1, 2], value=float("nan"))
+
+        assert store.completed_replicates(*GROUP, ["mi_1"], [1, 2]) == {"01", "02", "03", "04"}
+        assert store.completed_replicates(*GROUP, ["mi_1", "mi_kde"], [1, 2]) == {"03"}
+        assert store.replicate_count(*GROUP, ["mi_1"], [1, 2, 3]) == 0
+        assert store.replicate_count(*GROUP) == 1
+
+        assert store.max_standard_error(*GROUP, ["mi_1"], [1, 2]) == 0.0
+        assert store.max_standard_error(*GROUP, ["mi_1", "mi_kde"], [1, 2]) == math.inf
@@ -0,0 +1,32 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from scheduling_utils import prefetch
+
+
+def _failing_load(item):
+    if item == 2:
+        raise ValueError("unreadable")
+    return item * 10
+
+
+def test_prefetch_keeps_the_order_and_yields_errors():
+    results = list(prefetch(range(4), _failing_load, depth=2))
+    assert [item for item, _ in results] == [0, 1, 2, 3]
+    assert [results[0][1], results[1][1], results[3][1]] == [0, 10, 30]
+    assert isinstance(results[2][1], ValueError)
+
+
+def test_reader_exits_when_the_consumer_stops_before_the_end():
+    threads_before = threading.active_count()
+    loaded = prefetch(range(2), lambda item: item, depth=1)
+    next(loaded)
+    time.sleep(0.3)  # The reader has loaded the last item and waits for room for the end marker
+    loaded.close()
+    deadline = time.monotonic() + 5
+    while threading.active_count() > threads_before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() == threads_before
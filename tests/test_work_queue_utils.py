@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+from work_queue_utils import publish_tasks, claim_task, reap_expired_leases, run_worker, queue_status, collect_results
+from results_store import ResultsStore
+
+
+def _data_files(directory, count):
+    size_dir = os.path.join(directory, "gauss", "size_200")
+    os.makedirs(size_dir)
+    rng = np.random.default_rng(0)
+    paths = []
+    for file_num in range(1, count + 1):
+        path = os.path.join(size_dir, f"{file_num:02d}.npy")
+        np.save(path, rng.standard_normal((200, 2)))
+        paths.append(path)
+    return paths
+
+
+def test_publish_run_and_collect(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    file_paths = _data_files(str(tmp_path / "data"), 2)
+
+    assert publish_tasks(queue_dir, file_paths, ["mi_1", "mi_kde"], range(1, 5), k_chunk_size=2) == 6
+    assert publish_tasks(queue_dir, file_paths, ["mi_1", "mi_kde"], range(1, 5), k_chunk_size=2) == 0
+    assert run_worker(queue_dir, poll_interval=0.01) == 6
+    assert queue_status(queue_dir)["done"] == 6
+
+    store_path = str(tmp_path / "results.sqlite")
+    assert collect_results(queue_dir, store_path) == 6
+    with ResultsStore(store_path) as store:
+        results = store.query(estimator="mi_1")
+    assert len(results) == 8 and results["value"].notna().all()
+
+
+def test_tasks_of_the_loaded_file_are_claimed_first(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    file_paths = _data_files(str(tmp_path / "data"), 3)
+    publish_tasks(queue_dir, file_paths, ["mi_1"], range(1, 7), k_chunk_size=2)
+
+    claimed_files = [claim_task(queue_dir, file_paths[1])[1]["file_path"] for _ in range(3)]
+    assert claimed_files == [file_paths[1]] * 3
+
+
+def test_claimed_task_is_not_reaped_at_once(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    (file_path,) = _data_files(str(tmp_path / "data"), 1)
+    publish_tasks(queue_dir, [file_path], ["mi_1"], [1])
+    pending_path = os.path.join(queue_dir, "pending", os.listdir(os.path.join(queue_dir, "pending"))[0])
+    os.utime(pending_path, (0, 0))  # Published long ago
+
+    assert claim_task(queue_dir) is not None
+    assert reap_expired_leases(queue_dir, lease_timeout=60) == 0
+    assert queue_status(queue_dir)["claimed"] == 1
+
+
+def test_failing_task_is_retried_then_failed(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    bad_file = tmp_path / "bad.txt"
+    bad_file.write_text("1 2\n3 x\n")
+    publish_tasks(queue_dir, [str(bad_file)], ["mi_1"], [1])
+
+    # No lease timeout to wait for: the task is requeued at once and fails after max_attempts claims
+    assert run_worker(queue_dir, lease_timeout=3600, poll_interval=3600, max_attempts=2) == 0
+    status = queue_status(queue_dir)
+    assert status["failed"] == 1 and status["pending"] == 0 and status["claimed"] == 0
+    failed_dir = os.path.join(queue_dir, "failed")
+    with open(os.path.join(failed_dir, os.listdir(failed_dir)[0])) as file:
+        task = json.load(file)
+    assert task["attempts"] == 2 and "error" in task
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from sqlite_utils import connect_shared
+
+
+def data_content_hash(data):
+    """
+    SHA-256 digest of the values of a dataset (shape, dtype and bytes of the array).
+
+    Hashing the loaded values rather than the file makes the key independent of where and in
+    which format the data is stored: a copied, renamed or converted file hits the same entries.
+
+    :param data: NumPy array.
+    :return: Hexadecimal digest.
+    """
+    data = np.ascontiguousarray(data)
+    digest = hashlib.sha256()
+    digest.update(f"{data.dtype.str}{data.shape}".encode())
+    digest.update(data.data)
+    return digest.hexdigest()
+
+
+def result_key(data_hash, estimator_name, version, params):
+    """
+    Cache key of one estimator result.
+
+    :param data_hash: Content hash of the dataset (see data_content_hash).
+    :param estimator_name: Name of the estimator.
+    :param version: Version of the estimator implementation; bump it to invalidate old results.
+    :param params: Dictionary of the parameters the estimator depends on.
+    :return: Key string.
+    """
+    return f"{data_hash}:{estimator_name}:v{version}:{json.dumps(params, sort_keys=True)}"
+
+
+class ResultCache:
+    """
+    Persistent cache of estimator results in a SQLite file, with least-recently-used eviction.
+
+    Every result is committed as soon as it is stored, so an interrupted run keeps everything it
+    computed. The database runs in WAL mode with a busy timeout, so several worker processes can
+    share one cache file, each with its own ResultCache.
+    """
+
+    # Number of insertions between two checks of the size cap
+    EVICTION_INTERVAL = 256
+
+    def __init__(self, path, max_entries=1_000_000):
+        """
+        :param path: Path to the SQLite file (created if missing).
+        :param max_entries: Maximum number of results kept; the least recently used are evicted.
+        """
+        if max_entries <= 0:
+            raise ValueError("'max_entries' must be a positive integer.")
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = connect_shared(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value REAL, last_used REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._connection.commit()
+        self._insertions = 0
+
+    def get(self, key):
+        """
+        Cached value of a key, or None if it is not in the cache. A hit refreshes its LRU timestamp.
+        SQLite stores NaN as NULL, so a NULL value is a cached NaN and is returned as such.
+        """
+        row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self._connection:
+            self._connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return math.nan if row[0] is None else row[0]
+
+    def put(self, key, value):
+        """
+        Store a value and commit it immediately.
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                (key, float(value), time.time()),
+            )
+        self._insertions += 1
+        if self._insertions % self.EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def evict(self):
+        """
+        Delete the least recently used results beyond max_entries.
+
+        :return: Number of deleted results.
+        """
+        with self._connection:
+            excess = len(self) - self.max_entries
+            if excess <= 0:
+                return 0
+            self._connection.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)", (excess,)
+            )
+        return excess
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        """Apply the size cap and close the database."""
+        self.evict()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,175 @@
+import os
+import sys
+import hashlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from mutual_information_utils import extract_file_details
+from interface_utils import scan_file_entries
+from io_utils import load_data, expand_bundles, is_bundle_path, split_member_path, DATA_FILE_SUFFIXES
+
+
+# Columns of the catalog that can be used in selections
+CATALOG_COLUMNS = ("path", "distribution", "params", "size", "file_index", "file_size", "mtime_ns", "n_rows",
+                   "checksum")
+
+
+def file_content_summary(file_path, chunk_size=1 << 20):
+    """
+    Number of rows and SHA-256 checksum of a data file, computed in one streaming read (the number of
+    rows of a .npy file is read from its header). The checksum of a replicate of a bundle is computed
+    on its values.
+
+    :param file_path: Path to the data file or bundle member reference.
+    :param chunk_size: Bytes read at a time.
+    :return: Tuple (n_rows, checksum).
+    """
+    if split_member_path(file_path)[1] is not None:
+        data = np.ascontiguousarray(load_data(file_path))
+        return data.shape[0], hashlib.sha256(data.data).hexdigest()
+
+    digest = hashlib.sha256()
+    n_rows = 0
+    last_byte = b"\n"
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+            n_rows += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    if file_path.endswith(".npy"):
+        n_rows = np.load(file_path, mmap_mode='r').shape[0]
+    elif last_byte != b"\n":
+        n_rows += 1  # Last line without newline
+    return n_rows, digest.hexdigest()
+
+
+class DatasetCatalog:
+    """
+    Persistent SQLite index of the data files of a tree: path, distribution, params, size and file index
+    (as extract_file_details derives them), file size, modification time, number of rows and checksum.
+
+    The catalog is filled by an os.scandir crawl; later crawls only read the files whose size or
+    modification time changed and drop the files that disappeared, so refreshing a large tree costs
+    one stat per file. Workloads are then selected with queries instead of walking directories.
+    Bundles are catalogued as one entry per replicate (<bundle path>#NN), with the size and
+    modification time of the bundle.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path to the SQLite file (created if missing).
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=60)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, distribution TEXT, params TEXT, size TEXT, file_index TEXT, "
+            "file_size INTEGER, mtime_ns INTEGER, n_rows INTEGER, checksum TEXT)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS files_group ON files (distribution, params, size)")
+        self._connection.commit()
+
+    def refresh(self, root, file_extension=DATA_FILE_SUFFIXES, max_workers=8):
+        """
+        Crawl a directory tree and bring its entries of the catalog up to date.
+
+        :param root: Directory to crawl.
+        :param file_extension: Extension of the data files, or tuple of extensions.
+        :param max_workers: Threads reading the new or modified files (the reads are I/O bound).
+        :return: Dictionary with the numbers of added, updated, removed and unchanged files.
+        """
+        root = os.path.abspath(root)
+        known = {
+            path: (file_size, mtime_ns)
+            for path, file_size, mtime_ns in self._connection.execute(
+                "SELECT path, file_size, mtime_ns FROM files WHERE path LIKE ? ESCAPE '\\'",
+                (root.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + os.sep + '%',),
+            )
+        }
+
+        known_members = {}
+        for path in known:
+            bundle_path, index = split_member_path(path)
+            if index is not None:
+                known_members.setdefault(bundle_path, []).append(path)
+
+        # Crawl: one stat per file, no content read
+        found = {}
+        for entry in scan_file_entries(root, file_extension):
+            stat = entry.stat()
+            fingerprint = (stat.st_size, stat.st_mtime_ns)
+            if not is_bundle_path(entry.path):
+                found[entry.path] = fingerprint
+                continue
+            # Replicates of a bundle: from the catalog if unchanged, else from its header
+            members = known_members.get(entry.path, [])
+            if not members or any(known[path] != fingerprint for path in members):
+                members = expand_bundles([entry.path])
+            for path in members:
+                found[path] = fingerprint
+
+        changed = [path for path, fingerprint in found.items() if known.get(path) != fingerprint]
+        removed = [path for path in known if path not in found]
+
+        # Read the new and modified files
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            summaries = list(executor.map(file_content_summary, changed))
+
+        records = []
+        for path, (n_rows, checksum) in zip(changed, summaries):
+            details = extract_file_details(path)
+            records.append((path, details["distribution_name"], details["params"], details["size"],
+                            details["file_index"]) + found[path] + (n_rows, checksum))
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+            self._connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+
+        added = sum(path not in known for path in changed)
+        return {"added": added, "updated": len(changed) - added, "removed": len(removed),
+                "unchanged": len(found) - len(changed)}
+
+    def select(self, where=None, arguments=(), **filters):
+        """
+        Paths of the catalogued files matching a selection, sorted by path.
+
+        :param where: Optional SQL condition on the CATALOG_COLUMNS, e.g. "CAST(size AS INTEGER) >= ?".
+        :param arguments: Values of the placeholders of the condition.
+        :param filters: Values of any of the CATALOG_COLUMNS; a list or tuple matches any of its values.
+        :return: List of paths.
+        """
+        conditions = []
+        values = []
+        for column, value in filters.items():
+            if column not in CATALOG_COLUMNS:
+                raise ValueError(f"Unknown column '{column}'; valid columns are {CATALOG_COLUMNS}.")
+            options = value if isinstance(value, (list, tuple)) else [value]
+            conditions.append(f"{column} IN ({', '.join('?' * len(options))})")
+            values.extend(options)
+        if where:
+            conditions.append(f"({where})")
+            values.extend(arguments)
+        condition = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [path for (path,) in self._connection.execute(f"SELECT path FROM files{condition} ORDER BY path",
+                                                             values)]
+
+    def details(self, path):
+        """
+        Catalog entry of a file as a dictionary of the CATALOG_COLUMNS, or None if it is not catalogued.
+        """
+        row = self._connection.execute(f"SELECT {', '.join(CATALOG_COLUMNS)} FROM files WHERE path = ?",
+                                       (os.path.abspath(path),)).fetchone()
+        return None if row is None else dict(zip(CATALOG_COLUMNS, row))
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
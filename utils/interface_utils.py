@@ -1,4 +1,7 @@
 import os
+import re
+import glob
+from io_utils import expand_bundles, split_member_path, DATA_FILE_SUFFIXES
 
 def navigate_directories(start_path=".", multi_select=False, file_extension=".bin"):
     """
@@ -86,3 +89,125 @@ def navigate_directories(start_path=".", multi_select=False, file_extension=".bi
             print("[ERROR] Invalid command.")
 
     return selected_paths
+
+
+def scan_files(root, file_extension=DATA_FILE_SUFFIXES):
+    """
+    Recursively collects the files with a given extension below a directory, using os.scandir
+    so that no extra stat call is needed per entry. Hidden files and directories are skipped.
+
+    Parameters:
+        root (str): Directory to scan.
+        file_extension (str or tuple): File extension(s) to filter files (e.g., '.txt').
+
+    Returns:
+        list[str]: Sorted list of file paths.
+    """
+    return sorted(entry.path for entry in scan_file_entries(root, file_extension))
+
+
+def scan_file_entries(root, file_extension=DATA_FILE_SUFFIXES):
+    """
+    Yields the os.DirEntry of every file with a given extension below a directory, in no particular
+    order; the entries carry their stat, so that callers need no extra system call. Hidden files and
+    directories are skipped.
+
+    Parameters:
+        root (str): Directory to scan.
+        file_extension (str or tuple): File extension(s) to filter files (e.g., '.txt').
+
+    Yields:
+        os.DirEntry: Entries of the matching files.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.endswith(file_extension) and entry.is_file():
+                    yield entry
+
+
+def is_manifest_file(file_path):
+    """
+    Tells a manifest from a data file with the same extension (e.g. 'files.txt'): the first line that
+    is neither blank nor a '#' comment is numeric in a text data file and a path in a manifest.
+    Binary files are data files.
+
+    Parameters:
+        file_path (str): Path to an existing file.
+
+    Returns:
+        bool: True if the file is a manifest.
+    """
+    with open(file_path, 'rb') as file:
+        head = file.read(4096)
+    if b'\0' in head:
+        return False
+    for line in head.decode(errors='replace').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            [float(token) for token in line.replace(',', ' ').split()]
+            return False
+        except ValueError:
+            return True
+    return False
+
+
+def _read_manifest(manifest_path):
+    """Entries of a manifest, as paths relative to the directory of the manifest."""
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, 'r') as manifest:
+        # '#' starts a comment at the beginning of a line or after a blank (not in <bundle>#NN)
+        entries = [re.split(r'(?:^|\s)#', line, maxsplit=1)[0].strip() for line in manifest]
+    return [os.path.join(manifest_dir, entry) for entry in entries if entry]
+
+
+def discover_files(inputs, file_extension=DATA_FILE_SUFFIXES):
+    """
+    Non-interactive counterpart of navigate_directories: resolves a list of inputs to data files.
+
+    Each input can be a data file, a directory (scanned recursively), a glob pattern (with '**'
+    for recursion) or a manifest file listing one input per line ('#' at the start of a line or
+    after a blank starts a comment; relative paths are relative to the manifest). A manifest with
+    the extension of the data files (e.g. 'files.txt') is recognized by its content, and '@' before
+    a path ('@files.txt') always reads it as a manifest. Bundles are replaced by the references to
+    their replicates (<bundle path>#NN), and such references are accepted as inputs.
+
+    Parameters:
+        inputs (list[str]): Files, directories, glob patterns or manifest files.
+        file_extension (str or tuple): File extension(s) of the data files (e.g., '.txt').
+
+    Returns:
+        list[str]: Absolute paths of the data files, without duplicates, in a stable order.
+    """
+    selected_paths = []
+    for item in inputs:
+        if item.startswith('@') and os.path.isfile(item[1:]):
+            selected_paths.extend(discover_files(_read_manifest(item[1:]), file_extension))
+        elif os.path.isdir(item):
+            selected_paths.extend(scan_files(item, file_extension))
+        elif os.path.isfile(item) and item.endswith(file_extension) and not is_manifest_file(item):
+            selected_paths.append(item)
+        elif split_member_path(item)[1] is not None and os.path.isfile(split_member_path(item)[0]):
+            selected_paths.append(item)  # Replicate of a bundle
+        elif os.path.isfile(item):
+            # Manifest file: resolve every listed entry in turn
+            selected_paths.extend(discover_files(_read_manifest(item), file_extension))
+        elif glob.has_magic(item):
+            for match in sorted(glob.glob(item, recursive=True)):
+                if os.path.isdir(match):
+                    selected_paths.extend(scan_files(match, file_extension))
+                elif match.endswith(file_extension) and not is_manifest_file(match):
+                    selected_paths.append(match)
+        else:
+            print(f"[ERROR] Input not found: {item}")
+
+    # Expand the bundles and remove duplicates while keeping the order
+    return list(dict.fromkeys(os.path.abspath(path) for path in expand_bundles(selected_paths)))
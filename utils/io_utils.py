@@ -1,22 +1,357 @@
 import os
 import shutil 
+import struct
+import hashlib
+import zipfile
+from functools import lru_cache
 import numpy as np
 
 
-def load_data(file_path):
-    """Carica i dati da un file .txt, tentando automaticamente di determinare il delimitatore."""
+# Extensions of the data file formats ("file_format" of the configuration)
+DATA_FILE_FORMATS = {"txt": ".txt", "npy": ".npy"}
+DATA_FILE_EXTENSIONS = tuple(DATA_FILE_FORMATS.values())
+
+
+def data_file_extension(file_format):
+    """
+    Extension of the data files of a format.
+
+    Parameters:
+        file_format (str): One of the DATA_FILE_FORMATS.
+
+    Returns:
+        str: Extension including the dot.
+    """
+    if file_format not in DATA_FILE_FORMATS:
+        raise ValueError(f"Unknown file format '{file_format}'; valid formats are {sorted(DATA_FILE_FORMATS)}.")
+    return DATA_FILE_FORMATS[file_format]
+
+
+# Bundles keep all replicates of a distribution, params and size in one array of shape
+# (n_files, n_samples, n_columns): uncompressed (memory mapped) or compressed. Replicate NN of a
+# bundle is referenced as <bundle path>#NN wherever a data file path is expected.
+BUNDLE_FILE_NAMES = {"bundle": "replicates.npy", "compressed_bundle": "replicates.npz"}
+MEMBER_SEPARATOR = "#"
+
+# Endings of the names of the data files and bundles, as matched by the file discovery
+DATA_FILE_SUFFIXES = DATA_FILE_EXTENSIONS + (BUNDLE_FILE_NAMES["compressed_bundle"],)
+
+
+def is_bundle_path(file_path):
+    """True if a path names a replicate bundle."""
+    return os.path.basename(file_path) in BUNDLE_FILE_NAMES.values()
+
+
+def member_path(bundle_path, file_num):
+    """Reference to replicate file_num (starting at 1) of a bundle."""
+    return f"{bundle_path}{MEMBER_SEPARATOR}{file_num:02d}"
+
+
+def split_member_path(file_path):
+    """
+    Split a reference to a replicate of a bundle.
+
+    Parameters:
+        file_path (str): Data file path or bundle member reference.
+
+    Returns:
+        tuple: (bundle path, index of the replicate starting at 0), or (file_path, None) for a data file.
+    """
+    bundle_path, separator, member = file_path.rpartition(MEMBER_SEPARATOR)
+    if not separator or not is_bundle_path(bundle_path):
+        return file_path, None
+    if not member.isdigit() or int(member) < 1:
+        raise ValueError(f"Invalid replicate '{member}' in {file_path}; replicates are numbered from 1.")
+    return bundle_path, int(member) - 1
+
+
+def write_bundle(bundle_path, replicates):
+    """
+    Write the replicates of a configuration as one bundle, compressed if the path ends in .npz.
+
+    Parameters:
+        bundle_path (str): Path of the bundle (one of the BUNDLE_FILE_NAMES).
+        replicates (np.ndarray): Array of shape (n_files, n_samples, n_columns).
+    """
+    replicates = np.ascontiguousarray(replicates, dtype=np.float64)
+    if bundle_path.endswith(".npz"):
+        np.savez_compressed(bundle_path, replicates=replicates)
+    else:
+        np.save(bundle_path, replicates)
+
+
+@lru_cache(maxsize=1)
+def _read_compressed_bundle(bundle_path, fingerprint):
+    # Decompressed once for consecutive replicates of the same bundle; the fingerprint invalidates rewrites.
+    # Read-only, since the replicates handed out are views of the cached array
+    with np.load(bundle_path) as bundle:
+        replicates = bundle["replicates"]
+    replicates.flags.writeable = False
+    return replicates
+
+
+def _load_bundle(bundle_path):
+    """
+    All replicates of a bundle: memory mapped if uncompressed, decompressed (and kept) otherwise.
+
+    A compressed bundle is decompressed as a whole even for one replicate, and the last one stays in
+    memory in each process (see scheduling_utils.estimate_bundle_cache_memory).
+    """
+    if bundle_path.endswith(".npz"):
+        return _read_compressed_bundle(bundle_path, _file_fingerprint(bundle_path))
+    return np.load(bundle_path, mmap_mode='r')
+
+
+def bundle_shape(bundle_path):
+    """
+    Shape (n_files, n_samples, n_columns) of a bundle, read from its header only.
+    """
+    if not bundle_path.endswith(".npz"):
+        return np.load(bundle_path, mmap_mode='r').shape
+    with zipfile.ZipFile(bundle_path) as archive, archive.open("replicates.npy") as member:
+        version = np.lib.format.read_magic(member)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        return read_header(member)[0]
+
+
+def expand_bundles(file_paths):
+    """
+    Replace the bundles of a list of data file paths by the references to their replicates.
+    """
+    expanded = []
+    for file_path in file_paths:
+        if is_bundle_path(file_path):
+            expanded.extend(member_path(file_path, file_num) for file_num in range(1, bundle_shape(file_path)[0] + 1))
+        else:
+            expanded.append(file_path)
+    return expanded
+
+
+def data_file_rows(file_path):
+    """
+    Number of rows of a binary data file or bundle replicate, read from the header; None for text files.
+    """
+    bundle_path, index = split_member_path(file_path)
+    if index is not None:
+        return bundle_shape(bundle_path)[1]
+    if file_path.endswith(".npy"):
+        return np.load(file_path, mmap_mode='r').shape[0]
+    return None
+
+
+def write_data_file(file_path, data):
+    """
+    Write a data matrix in the format given by the extension of the path: .npy files are binary
+    (exact, about a third of the size of the text and memory mapped by load_data), anything else is
+    text without headers and with 17 significant digits, which read back to exactly the same float64.
+
+    Parameters:
+        file_path (str): Path of the data file.
+        data (np.ndarray): Data matrix of shape (n_samples, n_columns).
+    """
+    if file_path.endswith(".npy"):
+        np.save(file_path, np.ascontiguousarray(data, dtype=np.float64))
+    else:
+        np.savetxt(file_path, data, fmt="%.17g")
+
+
+def _parse_text_data(file_path):
+    """
+    Parse a numeric text data file with np.loadtxt, determining the delimiter from the first line.
+    Like np.loadtxt, dimensions of length one are squeezed.
+    """
     with open(file_path, 'r') as file:
-        # Leggi la prima riga per determinare il delimitatore
         first_line = file.readline()
-        if ',' in first_line:
-            delimiter = ','
-        elif '\t' in first_line:
-            delimiter = '\t'
-        else:
-            delimiter = ' '  # Default: spazio
+    if ',' in first_line:
+        delimiter = ','
+    elif '\t' in first_line:
+        delimiter = '\t'
+    else:
+        delimiter = None  # Default: any whitespace
     return np.loadtxt(file_path, delimiter=delimiter)
 
 
+def load_data(file_path):
+    """
+    Load a numeric data file. Binary .npy files are memory mapped read-only, so that only the pages
+    that are used are read; text files are parsed with their delimiter determined from the first line.
+    A bundle member reference (<bundle path>#NN) loads replicate NN of the bundle.
+
+    Parameters:
+        file_path (str): Path to the data file or bundle member reference.
+
+    Returns:
+        np.ndarray: Data matrix of shape (n_samples, n_columns).
+    """
+    bundle_path, index = split_member_path(file_path)
+    if index is not None:
+        replicates = _load_bundle(bundle_path)
+        if index >= len(replicates):
+            raise ValueError(f"{bundle_path} holds {len(replicates)} replicates; {file_path} does not exist.")
+        data = replicates[index]
+    elif file_path.endswith(".npy"):
+        data = np.load(file_path, mmap_mode='r')
+    else:
+        data = _parse_text_data(file_path)
+    return data
+
+
+def sort_index_path(file_path):
+    """
+    Path of the sort index sidecar stored next to a data file; the replicates of a bundle share the
+    sidecar of the bundle.
+    """
+    return f"{split_member_path(file_path)[0]}.sortidx.npz"
+
+
+# Bytes hashed at each end of a file by _file_fingerprint
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+
+def _file_fingerprint(file_path):
+    """
+    Size, modification time and digest of the first and last blocks of a file (of its bundle for a
+    replicate reference), used to detect changes. The digest catches a rewrite with the same size
+    within one tick of a coarse modification time, which the first two miss.
+    """
+    with open(split_member_path(file_path)[0], 'rb') as file:
+        stat = os.fstat(file.fileno())
+        digest = hashlib.blake2b(file.read(FINGERPRINT_BLOCK_SIZE), digest_size=16)
+        if stat.st_size > FINGERPRINT_BLOCK_SIZE:
+            file.seek(max(FINGERPRINT_BLOCK_SIZE, stat.st_size - FINGERPRINT_BLOCK_SIZE))
+            digest.update(file.read())
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+def build_sort_index(data):
+    """
+    Compute the column sort index of a dataset.
+
+    Parameters:
+        data (np.ndarray): Data matrix of shape (n_samples, n_variables), or the replicates of a bundle
+            of shape (n_files, n_samples, n_variables), each indexed on its own.
+
+    Returns:
+        dict: 'order' with the stable argsort permutation of each column and 'sorted' with the
+        sorted values of each column, both of the shape of data.
+    """
+    order = np.argsort(data, axis=-2, kind='stable')
+    return {"order": order, "sorted": np.take_along_axis(data, order, axis=-2)}
+
+
+def save_sort_index(file_path, data=None):
+    """
+    Write the sort index sidecar of a data file, tagged with the fingerprint of the data file (size,
+    modification time and digest of its ends) so that it is ignored as soon as the data file changes.
+
+    A bundle has one sidecar holding the sort indices of all its replicates; given a replicate
+    reference, the sidecar of its whole bundle is written.
+
+    Parameters:
+        file_path (str): Path to the data file, bundle or bundle member reference.
+        data (np.ndarray, optional): The data exactly as load_data (or, for a bundle, _load_bundle) returns
+            it; loaded from the file if omitted. Ignored for a bundle member reference.
+
+    Returns:
+        dict: The sort index that was written (of the replicate, for a bundle member reference).
+    """
+    bundle_path, index = split_member_path(file_path)
+    if index is not None:
+        return {name: array[index] for name, array in save_sort_index(bundle_path).items()}
+    if data is None:
+        data = _load_bundle(file_path) if is_bundle_path(file_path) else load_data(file_path)
+    sort_index = build_sort_index(data)
+    source_size, source_mtime_ns, source_digest = _file_fingerprint(file_path)
+    # Stored uncompressed, so that the sort index of one replicate is memory mapped out of the sidecar,
+    # and renamed into place, since the workers of the replicates of a bundle may build it concurrently
+    sidecar_path = sort_index_path(file_path)
+    temporary_path = f"{sidecar_path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        temporary_path,
+        order=sort_index["order"],
+        sorted=sort_index["sorted"],
+        source_size=source_size,
+        source_mtime_ns=source_mtime_ns,
+        source_digest=source_digest,
+    )
+    os.replace(temporary_path, sidecar_path)
+    return sort_index
+
+
+def _memmap_npz_array(npz_path, name):
+    """Read-only memory map of an array stored uncompressed in an .npz file (None if it is compressed)."""
+    with zipfile.ZipFile(npz_path) as archive:
+        info = archive.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(npz_path, 'rb') as file:
+        # The data follow the local file header, whose name and extra field lengths may differ from the directory's
+        file.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', file.read(4))
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(file)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(file)
+        offset = file.tell()
+    return np.memmap(npz_path, dtype=dtype, mode='r', shape=shape, offset=offset, order='F' if fortran_order else 'C')
+
+
+def load_sort_index(file_path, data_shape=None):
+    """
+    Load the sort index sidecar of a data file.
+
+    Parameters:
+        file_path (str): Path to the data file or bundle member reference (not to the sidecar).
+        data_shape (tuple, optional): Expected shape of the data, checked against the sidecar.
+
+    Returns:
+        dict or None: The sort index, or None if there is no sidecar or it is stale. For a bundle member
+        reference, the sort index of the replicate, memory mapped out of the sidecar of the bundle.
+    """
+    sidecar_path = sort_index_path(file_path)
+    if not os.path.exists(sidecar_path):
+        return None
+    index = split_member_path(file_path)[1]
+    try:
+        with np.load(sidecar_path) as sidecar:
+            source = (int(sidecar["source_size"]), int(sidecar["source_mtime_ns"]), str(sidecar["source_digest"]))
+            if source != _file_fingerprint(file_path):
+                return None
+            if index is None:
+                sort_index = {"order": sidecar["order"], "sorted": sidecar["sorted"]}
+        if index is not None:
+            sort_index = {}
+            for name in ("order", "sorted"):
+                array = _memmap_npz_array(sidecar_path, name)
+                if array is None:
+                    with np.load(sidecar_path) as sidecar:
+                        array = sidecar[name]
+                sort_index[name] = array[index]
+    except (OSError, KeyError, ValueError, IndexError):
+        return None
+    if data_shape is not None and sort_index["order"].shape != tuple(data_shape):
+        return None
+    return sort_index
+
+
+def load_data_with_sort_index(file_path, build_missing=False):
+    """
+    Load a data file together with its sort index sidecar.
+
+    Parameters:
+        file_path (str): Path to the data file.
+        build_missing (bool): If True, a missing or stale sidecar is rebuilt and written.
+
+    Returns:
+        tuple: (data, sort_index), where sort_index is None if no valid sidecar is available.
+    """
+    data = load_data(file_path)
+    sort_index = load_sort_index(file_path, data_shape=data.shape)
+    if sort_index is None and build_missing:
+        sort_index = save_sort_index(file_path, data)
+    return data, sort_index
+
+
 def save_results(results, file_path):
     ensure_directory(os.path.dirname(file_path))
     with open(file_path, 'w') as f:
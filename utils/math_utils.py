@@ -127,4 +127,39 @@ def gamma_exponential_mi_theoretical(u):
     if u <= 0:
         raise ValueError("The parameter u must be greater than 0.")
     mi_exact = digamma(u + 1) - np.log(u)
-    return mi_exact
\ No newline at end of file
+    return mi_exact
+
+def welford_update(count, mean, m2, value):
+    """
+    Add a value to the running count, mean and sum of squared deviations (Welford's algorithm).
+
+    Works elementwise on NumPy arrays as well as on scalars. The variance is m2 / count
+    (m2 / (count - 1) for the sample variance).
+
+    :param count: Number of values accumulated so far.
+    :param mean: Running mean.
+    :param m2: Running sum of squared deviations from the mean.
+    :param value: New value.
+    :return: Updated (count, mean, m2).
+    """
+    count = count + 1
+    delta = value - mean
+    mean = mean + delta / count
+    m2 = m2 + delta * (value - mean)
+    return count, mean, m2
+
+
+def welford_remove(count, mean, m2, value):
+    """
+    Remove a previously added value from the running count, mean and sum of squared deviations
+    (the inverse of welford_update for scalars, used when a result is replaced).
+
+    :return: Updated (count, mean, m2).
+    """
+    count = count - 1
+    if count <= 0:
+        return 0, 0.0, 0.0
+    delta = value - mean
+    mean = mean - delta / count
+    m2 = max(0.0, m2 - delta * (value - mean))
+    return count, mean, m2
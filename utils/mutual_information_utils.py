@@ -1,7 +1,7 @@
 import sys
 import os
+import math
 import numpy as np
-import shutil
 import csv
 from concurrent.futures import ProcessPoolExecutor
 from functools import partial
@@ -9,13 +9,25 @@ import pandas as pd
 import glob
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
-from io_utils import load_data
+from io_utils import (load_data, load_data_with_sort_index, split_member_path, expand_bundles, DATA_FILE_SUFFIXES,
+                      build_sort_index as build_column_sort_index)
 from interface_utils import navigate_directories
+from scheduling_utils import (estimate_task_memory, estimate_loaded_data_memory, estimate_file_rows,
+                              estimate_bundle_cache_memory, available_memory, limit_nested_parallelism, run_scheduled,
+                              prefetch, WORKER_BASE_MEMORY)
+from cache_utils import ResultCache, data_content_hash, result_key
+from results_store import ResultsStore
+from math_utils import welford_update
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../core/')))
 from mutual_information_1 import *
 from mutual_information_1_entropies_sum import *
+from mutual_information_mixed import *
 from mutual_information_binning import *
+from mutual_information_adaptive_partitioning import *
+from mutual_information_binning_sketch import *
+from mutual_information_kde import *
+from mutual_information_extrapolation import *
 
 
 def compute_std_corr_matrix(data):
@@ -36,6 +48,56 @@ def compute_std_corr_matrix(data):
 
 
 
+# Estimators evaluated in the k sweep, by CSV column. 'params' lists the sweep parameters the
+# estimator actually depends on: results are memoized per dataset on those parameters only.
+# 'version' is part of the result cache key: bump it whenever a change alters the estimates.
+MI_ESTIMATORS = {
+    "mi_1": {"function": mutual_information_1, "params": ("k",), "uses_sort_index": True, "version": 1},
+    "mi_sum": {"function": mutual_information_1_entropies_sum, "params": ("k",), "uses_sort_index": True,
+               "version": 1},
+    "mi_binning": {"function": mutual_information_binningadaptive, "params": ("num_bins",), "uses_sort_index": True,
+                   "version": 1},
+    "mi_mixed": {"function": mutual_information_mixed, "params": ("k",), "uses_sort_index": True, "version": 1},
+    "mi_partitioning": {"function": mutual_information_adaptive_partitioning, "params": (), "uses_sort_index": True,
+                        "version": 1},
+    "mi_kde": {"function": mutual_information_kde, "params": (), "uses_sort_index": False, "version": 1},
+}
+
+# Estimators written to the CSV tables unless a different selection is requested
+DEFAULT_MI_ESTIMATORS = ("mi_1", "mi_sum", "mi_binning")
+
+
+def memoized_estimate(memo, name, data, sweep_params, sort_index=None, cache=None, data_hash=None):
+    """
+    Evaluate a registered estimator on a dataset, reusing the result of an earlier call with the
+    same values of the parameters the estimator depends on.
+
+    :param memo: Dictionary of the results already computed for this dataset (updated in place).
+    :param name: Name of the estimator in MI_ESTIMATORS.
+    :param data: The dataset.
+    :param sweep_params: Current values of all sweep parameters (e.g. {"k": 3, "num_bins": 10}).
+    :param sort_index: Optional precomputed column sort index of the dataset.
+    :param cache: Optional ResultCache consulted before computing and updated after.
+    :param data_hash: Content hash of the dataset, required with a cache.
+    :return: The mutual information estimate.
+    """
+    estimator = MI_ESTIMATORS[name]
+    params = {param: sweep_params[param] for param in estimator["params"]}
+    key = (name, tuple(sorted(params.items())))
+    if key not in memo:
+        cache_key = None
+        if cache is not None:
+            cache_key = result_key(data_hash, name, estimator["version"], params)
+            memo[key] = cache.get(cache_key)
+        if memo.get(key) is None:
+            if estimator["uses_sort_index"]:
+                params["sort_index"] = sort_index
+            memo[key] = estimator["function"](data, **params)
+            if cache_key is not None:
+                cache.put(cache_key, memo[key])
+    return memo[key]
+
+
 # Functions that compute the mi estimate for a single file and for a directory.
 
 def process_file(file_path, k, mi_estimate):
@@ -65,14 +127,15 @@ def extract_file_details(file_path):
     """
     Extracts distribution name, size, parameters, and file index from a given file path.
 
-    :param file_path: Path to the file.
+    :param file_path: Path to the file, or reference to a replicate of a bundle (<bundle path>#NN).
     :return: A dictionary with distribution_name, size, params, and file_index.
     """
-    base_name = os.path.basename(file_path)
-    dir_name = os.path.dirname(file_path)
+    bundle_path, member_index = split_member_path(file_path)
+    base_name = os.path.basename(bundle_path)
+    dir_name = os.path.dirname(bundle_path)
 
-    # Extract file index from the file name
-    file_index = base_name.split('.')[0]
+    # Extract file index from the file name, or from the replicate number of a bundle
+    file_index = base_name.split('.')[0] if member_index is None else f"{member_index + 1:02d}"
 
     # Extract size from the directory "size_*"
     size_dir = [part for part in dir_name.split(os.sep) if part.startswith("size_")]
@@ -93,14 +156,27 @@ def extract_file_details(file_path):
         "file_index": file_index
     }
 
-def process_and_save_mi_table(file_path, num_bins=10):
+def process_and_save_mi_table(file_path, num_bins=10, build_sort_index=False, estimators=DEFAULT_MI_ESTIMATORS,
+                              k_values=range(1, 31), output_dir=None, cache_path=None, cache_max_entries=1_000_000,
+                              results_store_path=None, write_csv=True, data=None, sort_index=None):
     """
     Process a dataset file and save mutual information calculations to a CSV file.
 
     :param file_path: Path to the input dataset file.
     :param num_bins: Number of bins for the adaptive binning MI calculation.
-    :return: Path to the generated CSV file.
+    :param build_sort_index: If True, write the sort index sidecar when it is missing or stale.
+    :param estimators: Names of the MI_ESTIMATORS to evaluate, one CSV column each.
+    :param k_values: Numbers of nearest neighbors of the sweep, one CSV row each.
+    :param output_dir: Directory where the CSV file is written (defaults to the working directory).
+    :param cache_path: Optional SQLite result cache; only the results missing from it are computed.
+    :param cache_max_entries: Size cap of the result cache.
+    :param results_store_path: Optional ResultsStore where the table is also written.
+    :param write_csv: If False, the per-file CSV is not written (the results go only to the results store).
+    :param data: Dataset already in memory; file_path then only names and groups the results and is not read.
+    :param sort_index: Column sort index of the in-memory dataset, if already loaded (built otherwise).
+    :return: Path to the generated CSV file (to the results store when no CSV is written), or None on failure.
     """
+    cache = None
     try:
         # Extract details from the file path
         details = extract_file_details(file_path)
@@ -111,27 +187,146 @@ def process_and_save_mi_table(file_path, num_bins=10):
 
         # Prepare output CSV file name
         output_csv = f"mi_{distribution_name}_size_{size}_params_{params}_file_{file_index}.csv"
+        if output_dir is not None:
+            output_csv = os.path.join(output_dir, output_csv)
+
+        # Load the dataset and its column sort index; without a sidecar the index is built in memory,
+        # which keeps the marginal neighbor counts in O(n) memory instead of O(n^2)
+        if data is None:
+            data, sort_index = load_data_with_sort_index(file_path, build_missing=build_sort_index)
+        if sort_index is None:
+            sort_index = build_column_sort_index(data)
+
+        # Results already in the cache are reused; each new one is stored as soon as it is computed
+        data_hash = None
+        if cache_path is not None:
+            cache = ResultCache(cache_path, max_entries=cache_max_entries)
+            data_hash = data_content_hash(data)
+
+        # Prepare rows for the CSV; estimators that do not depend on k run only once
+        estimator_names = list(estimators)
+        rows = [["k"] + estimator_names]
+        memo = {}
+        for k in k_values:
+            sweep_params = {"k": k, "num_bins": num_bins}
+            rows.append([k] + [
+                memoized_estimate(memo, name, data, sweep_params, sort_index, cache, data_hash)
+                for name in estimator_names
+            ])
+
+        if results_store_path is not None:
+            with ResultsStore(results_store_path) as store:
+                store.add_table(details, rows)
+            if not write_csv:
+                print(f"Mutual information results of {file_path} saved to: {results_store_path}")
+                return results_store_path
 
-        # Load the dataset
-        data = load_data(file_path)
+        # Write the results to the CSV file
+        with open(output_csv, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerows(rows)
 
-        # Prepare rows for the CSV
-        rows = [["k", "mi_1", "mi_sum", "mi_binning"]]
-        for k in range(1, 31):
-            # Compute MI using the three methods
-            mi_1 = mutual_information_1(data, k)
-            mi_sum = mutual_information_1_entropies_sum(data, k)
-            mi_binning = mutual_information_binningadaptive(data, num_bins)
+        print(f"Mutual information results saved to: {output_csv}")
+        return output_csv
 
-            # Append the results
-            rows.append([k, mi_1, mi_sum, mi_binning])
+    except Exception as e:
+        print(f"Error processing file {file_path}: {e}")
+        return None
+
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def process_and_save_mi_extrapolation(file_path, k=3, num_bins=10, n_levels=5, min_size=100, seed=None,
+                                      estimators=DEFAULT_MI_ESTIMATORS, output_dir=None):
+    """
+    Process a single large dataset file with the finite-size extrapolation mode and save the
+    mutual information of each nested subsample level, plus the extrapolated value, to a CSV file.
+
+    :param file_path: Path to the input dataset file.
+    :param k: Number of nearest neighbors for the kNN estimators.
+    :param num_bins: Number of bins for the adaptive binning MI calculation.
+    :param n_levels: Maximum number of halving levels (N, N/2, N/4, ...).
+    :param min_size: Smallest subsample size that is still evaluated.
+    :param seed: Seed for the shuffling shared by all estimators.
+    :param estimators: Names of the MI_ESTIMATORS to extrapolate, one CSV column each.
+    :param output_dir: Directory where the CSV file is written (defaults to the working directory).
+    :return: Path to the generated CSV file.
+    """
+    try:
+        details = extract_file_details(file_path)
+        output_csv = (
+            f"mi_extrapolation_{details['distribution_name']}_size_{details['size']}"
+            f"_params_{details['params']}_file_{details['file_index']}.csv"
+        )
+        if output_dir is not None:
+            output_csv = os.path.join(output_dir, output_csv)
+
+        # Cleaned and shuffled once, so every estimator sees the same sample and the same blocks
+        # (also without a seed)
+        data = shuffled_finite_sample(load_data(file_path), seed=seed)
+
+        estimator_names = list(estimators)
+        sweep_params = {"k": k, "num_bins": num_bins}
+        results = {}
+        for name in estimator_names:
+            estimator = MI_ESTIMATORS[name]
+            params = {param: sweep_params[param] for param in estimator["params"]}
+            results[name] = mutual_information_extrapolated(
+                data, estimator["function"], n_levels=n_levels, min_size=min_size, shuffled=True, **params)
+
+        # One row per subsample level and a final row with the extrapolated values
+        rows = [["size", "n_blocks"] + estimator_names]
+        reference = results[estimator_names[0]]
+        for level, size in enumerate(reference["sizes"]):
+            rows.append([size, reference["n_blocks"][level]] +
+                        [results[name]["mi_mean"][level] for name in estimator_names])
+        rows.append(["inf", 0] + [results[name]["mi_extrapolated"] for name in estimator_names])
 
-        # Write the results to the CSV file
         with open(output_csv, mode='w', newline='') as file:
             writer = csv.writer(file)
             writer.writerows(rows)
 
-        print(f"Mutual information results saved to: {output_csv}")
+        print(f"Mutual information extrapolation saved to: {output_csv}")
+        return output_csv
+
+    except Exception as e:
+        print(f"Error processing file {file_path}: {e}")
+        return None
+
+
+def process_and_save_mi_bins_sweep(file_path, bin_counts=range(2, 201), build_sort_index=False, output_dir=None):
+    """
+    Process a dataset file and save the adaptive binning mutual information as a function of the
+    number of bins to a CSV file.
+
+    :param file_path: Path to the input dataset file.
+    :param bin_counts: Numbers of bins to evaluate.
+    :param build_sort_index: If True, write the sort index sidecar when it is missing or stale.
+    :param output_dir: Directory where the CSV file is written (defaults to the working directory).
+    :return: Path to the generated CSV file.
+    """
+    try:
+        details = extract_file_details(file_path)
+        output_csv = (
+            f"mi_bins_{details['distribution_name']}_size_{details['size']}"
+            f"_params_{details['params']}_file_{details['file_index']}.csv"
+        )
+        if output_dir is not None:
+            output_csv = os.path.join(output_dir, output_csv)
+
+        data, sort_index = load_data_with_sort_index(file_path, build_missing=build_sort_index)
+
+        bin_counts = list(bin_counts)
+        mi_values = mutual_information_binning_sweep(data, bin_counts, sort_index=sort_index)
+
+        with open(output_csv, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["num_bins", "mi_binning"])
+            writer.writerows(zip(bin_counts, mi_values))
+
+        print(f"Mutual information bin sweep saved to: {output_csv}")
         return output_csv
 
     except Exception as e:
@@ -139,6 +334,55 @@ def process_and_save_mi_table(file_path, num_bins=10):
         return None
 
 
+def _quantile_sketches_of_file(file_path, seed_sequence, capacity):
+    """Marginal quantile sketches of one shard (worker of compute_binning_mi_sharded)."""
+    data = np.asarray(load_data(file_path), dtype=float)
+    data = data[np.all(np.isfinite(data), axis=1)]  # The rows the joint pass keeps
+    x_seed, y_seed = seed_sequence.spawn(2)
+    return (QuantileSketch(capacity=capacity, seed=x_seed).update(data[:, 0]),
+            QuantileSketch(capacity=capacity, seed=y_seed).update(data[:, 1]))
+
+
+def _joint_sketch_of_file(file_path, empty_sketch):
+    """Joint histogram sketch of one shard (worker of compute_binning_mi_sharded)."""
+    return empty_sketch.update(load_data(file_path))
+
+
+def compute_binning_mi_sharded(file_paths, num_bins=10, strategy='quantile', max_workers=None,
+                               capacity=2048, seed=None):
+    """
+    Compute the binning mutual information of a dataset split over several files, histogramming
+    the shards in parallel and merging the sketches.
+
+    :param file_paths: Paths of the shard files, which together form one dataset.
+    :param num_bins: Number of bins for each variable.
+    :param strategy: 'quantile' (adaptive binning) or 'uniform' (equal-width binning).
+    :param max_workers: Number of worker processes (defaults to the number of CPUs).
+    :param capacity: Capacity of the quantile sketches.
+    :param seed: Seed for the quantile sketches, from which every sketch derives its own stream.
+    :return: Estimated mutual information.
+    """
+    # Independent compaction streams for the sketches of every shard and for the merged sketches
+    merged_seed, *shard_seeds = np.random.SeedSequence(seed).spawn(len(file_paths) + 1)
+    x_seed, y_seed = merged_seed.spawn(2)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # First pass: merge the marginal sketches of all shards to fix the bin edges
+        x_sketch = QuantileSketch(capacity=capacity, seed=x_seed)
+        y_sketch = QuantileSketch(capacity=capacity, seed=y_seed)
+        for shard_x, shard_y in executor.map(partial(_quantile_sketches_of_file, capacity=capacity),
+                                             file_paths, shard_seeds):
+            x_sketch.merge(shard_x)
+            y_sketch.merge(shard_y)
+        joint_sketch = joint_sketch_from_marginals(x_sketch, y_sketch, num_bins, strategy)
+
+        # Second pass: merge the joint histograms of all shards
+        empty_sketch = joint_sketch_from_marginals(x_sketch, y_sketch, num_bins, strategy)
+        for shard_sketch in executor.map(partial(_joint_sketch_of_file, empty_sketch=empty_sketch), file_paths):
+            joint_sketch.merge(shard_sketch)
+
+    return joint_sketch.mutual_information(first_order_correction=(strategy == 'quantile'))
+
+
 def create_summary_csv_for_folder(folder_path):
     """
     Create a summary CSV file for all CSVs in a given folder. Computes the mean and standard deviation
@@ -147,55 +391,42 @@ def create_summary_csv_for_folder(folder_path):
     :param folder_path: Path to the folder containing the CSV files.
     """
     try:
-        # Find all CSV files in the folder
-        csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
+        # Find all per-file CSV files in the folder (not a summary written by a previous run)
+        csv_files = [
+            csv_file for csv_file in glob.glob(os.path.join(folder_path, "*.csv"))
+            if not csv_file.endswith("_mean_error.csv")
+        ]
         if not csv_files:
             print(f"[INFO] No CSV files found in folder: {folder_path}")
             return
 
-        # Initialize storage for data
-        mi_1_values = []
-        mi_sum_values = []
-        mi_binning_values = []
+        # Running statistics per estimator column: (count, mean, m2) arrays over k
+        k_values = None
+        running = {}
 
-        # Loop through each CSV file and extract data
+        # Loop through each CSV file and add its values to the running statistics
         for csv_file in csv_files:
             try:
                 # Read the CSV file into a pandas DataFrame
                 df = pd.read_csv(csv_file)
+                if k_values is None:
+                    k_values = df["k"].to_numpy()
+                    running = {column: (0, 0.0, 0.0) for column in df.columns if column != "k"}
 
-                # Append values for each k
-                mi_1_values.append(df["mi_1"].to_numpy())
-                mi_sum_values.append(df["mi_sum"].to_numpy())
-                mi_binning_values.append(df["mi_binning"].to_numpy())
+                for column in running:
+                    running[column] = welford_update(*running[column], df[column].to_numpy())
             except Exception as e:
                 print(f"[ERROR] Failed to process {csv_file}: {e}")
                 continue
 
-        # Convert the collected values into numpy arrays
-        mi_1_values = np.array(mi_1_values)
-        mi_sum_values = np.array(mi_sum_values)
-        mi_binning_values = np.array(mi_binning_values)
-
-        # Calculate means and standard deviations for each k
-        k_values = np.arange(1, 31)
-        mean_mi_1 = np.mean(mi_1_values, axis=0)
-        sigma_mi_1 = np.std(mi_1_values, axis=0)
-        mean_mi_sum = np.mean(mi_sum_values, axis=0)
-        sigma_mi_sum = np.std(mi_sum_values, axis=0)
-        mean_mi_binning = np.mean(mi_binning_values, axis=0)
-        sigma_mi_binning = np.std(mi_binning_values, axis=0)
+        # Means and standard deviations for each k and estimator
+        summary = {"k": k_values}
+        for column, (count, mean, m2) in running.items():
+            summary[f"mean_{column}"] = mean
+            summary[f"sigma_{column}"] = np.sqrt(m2 / count)
 
         # Prepare the summary DataFrame
-        summary_df = pd.DataFrame({
-            "k": k_values,
-            "mean_mi_1": mean_mi_1,
-            "sigma_mi_1": sigma_mi_1,
-            "mean_mi_sum": mean_mi_sum,
-            "sigma_mi_sum": sigma_mi_sum,
-            "mean_mi_binning": mean_mi_binning,
-            "sigma_mi_binning": sigma_mi_binning,
-        })
+        summary_df = pd.DataFrame(summary)
 
         # Extract distribution, size, and params info from folder path
         folder_name = os.path.basename(folder_path)
@@ -214,17 +445,148 @@ def create_summary_csv_for_folder(folder_path):
         print(f"[ERROR] Failed to create summary CSV for folder {folder_path}: {e}")
 
 
-def analyze_and_save_mi_values(input_dir, output_dir, num_bins=10):
+def create_summary_csvs_from_store(results_store_path, mi_values_dir, dirty_only=True):
+    """
+    Write the summary CSV (mean and standard deviation over the files, for each k and estimator) of the
+    distribution/params/size groups of a results store into their subfolders of the mi_values tree.
+
+    The summaries come from the running statistics of the store, so writing one costs O(k x estimators)
+    whatever the number of files, and by default only the groups that received new results since their
+    summary was last written are rewritten.
+
+    :param results_store_path: Path to the ResultsStore.
+    :param mi_values_dir: Root of the mi_values tree.
+    :param dirty_only: If False, rewrite the summaries of every group.
+    """
+    with ResultsStore(results_store_path) as store:
+        for distribution_name, params, size in store.groups(dirty_only=dirty_only):
+            try:
+                folder_path = os.path.join(mi_values_dir, distribution_name, params, f"size_{size}")
+                os.makedirs(folder_path, exist_ok=True)
+                summary_csv_path = os.path.join(
+                    folder_path, f"mi_{distribution_name}_{params}_size_{size}_mean_error.csv"
+                )
+                store.summary(distribution_name, params, size).to_csv(summary_csv_path, index=False)
+                store.mark_clean((distribution_name, params, size))
+                print(f"[INFO] Summary CSV saved: {summary_csv_path}")
+            except Exception as e:
+                print(f"[ERROR] Failed to create summary CSV for {distribution_name}/{params}/size_{size}: {e}")
+
+
+def mi_output_subfolder(mi_values_dir, file_path):
+    """
+    Output subfolder of a data file in the mi_values tree: <distribution>/<params>/size_<N>.
+
+    :param mi_values_dir: Root of the mi_values tree.
+    :param file_path: Path to the data file.
+    :return: Path to the subfolder.
+    """
+    details = extract_file_details(file_path)
+    return os.path.join(mi_values_dir, details["distribution_name"], details["params"], f"size_{details['size']}")
+
+
+def analyze_file_into_tree(file_path, mi_values_dir, **table_options):
+    """
+    Compute the MI table of one data file and write it directly into its subfolder of the
+    mi_values tree (the task run by each worker of analyze_and_save_mi_values).
+
+    :param file_path: Path to the data file.
+    :param mi_values_dir: Root of the mi_values tree.
+    :param table_options: Options forwarded to process_and_save_mi_table.
+    :return: Path to the generated CSV file, or None on failure.
+    """
+    try:
+        subfolder_path = mi_output_subfolder(mi_values_dir, file_path)
+        os.makedirs(subfolder_path, exist_ok=True)
+        return process_and_save_mi_table(file_path, output_dir=subfolder_path, **table_options)
+    except Exception as e:
+        print(f"[ERROR] Failed to process file {file_path}: {e}")
+        return None
+
+
+def analyze_files_into_tree(file_paths, mi_values_dir, prefetch_depth=1, **table_options):
+    """
+    Compute the MI tables of a chunk of data files in one worker (the task of analyze_and_save_mi_values
+    with read-ahead): a reader thread of the worker loads the next files of the chunk, at most
+    prefetch_depth ahead, while the current one is estimated, so every worker overlaps its own I/O and
+    parsing with its compute and no data crosses the process boundary.
+
+    :param file_paths: Data files of the chunk, in processing order.
+    :param mi_values_dir: Root of the mi_values tree.
+    :param prefetch_depth: Maximum number of loaded files waiting to be estimated.
+    :param table_options: Options forwarded to process_and_save_mi_table.
+    :return: List of (file_path, output of analyze_file_into_tree), with None for the files that failed.
+    """
+    load = partial(load_data_with_sort_index, build_missing=table_options.get("build_sort_index", False))
+    results = []
+    for file_path, loaded in prefetch(file_paths, load, prefetch_depth):
+        if isinstance(loaded, Exception):
+            print(f"[ERROR] Failed to load file {file_path}: {loaded}")
+            results.append((file_path, None))
+            continue
+        data, sort_index = loaded
+        results.append((file_path, analyze_file_into_tree(file_path, mi_values_dir, data=data, sort_index=sort_index,
+                                                          **table_options)))
+    return results
+
+
+def estimate_file_task_memory(file_path, k_max, prefetch_depth=0):
+    """
+    Estimated peak memory of the MI table of a data file, in bytes.
+
+    The number of samples is read from the size_<N> folder of the file, or estimated from the
+    file size when the path does not follow the data tree layout. With read-ahead, the worker also
+    holds up to prefetch_depth loaded files waiting and one being loaded, counted at the same size
+    (the files of a chunk are sorted, so the next ones are not larger).
+
+    :param file_path: Path to the data file.
+    :param k_max: Largest number of nearest neighbors of the sweep.
+    :param prefetch_depth: Read-ahead depth of the worker (0: none).
+    :return: Estimated memory in bytes.
+    """
+    size = extract_file_details(file_path)["size"]
+    n_samples = int(size) if size.isdigit() else estimate_file_rows(file_path)
+    read_ahead = (prefetch_depth + 1) * estimate_loaded_data_memory(n_samples) if prefetch_depth > 0 else 0
+    return estimate_task_memory(n_samples, k_max) + read_ahead
+
+
+def analyze_and_save_mi_values(input_dir, output_dir, num_bins=10, selected_files=None,
+                               estimators=DEFAULT_MI_ESTIMATORS, k_values=range(1, 31), build_sort_index=False,
+                               max_workers=None, max_in_flight=None, memory_budget=None, use_cache=True,
+                               cache_path=None, cache_max_entries=1_000_000, results_store_path=None,
+                               write_file_csvs=False, prefetch_depth=0):
     """
-    Analyze .txt files in the input directory, compute mutual information, and save results
+    Analyze the data files (.txt or .npy) in the input directory, compute mutual information, and save results
     in a structured output directory.
 
-    :param input_dir: Path to the input directory containing .txt files.
+    :param input_dir: Path to the input directory containing the data files.
     :param output_dir: Path to the output directory where results will be saved.
     :param num_bins: Number of bins for the adaptive binning MI calculation.
+    :param selected_files: Files to analyze; if None they are selected interactively starting from input_dir.
+    :param estimators: Names of the MI_ESTIMATORS to evaluate.
+    :param k_values: Numbers of nearest neighbors of the sweep.
+    :param build_sort_index: If True, write the sort index sidecars that are missing or stale.
+    :param max_workers: Number of worker processes (defaults to the number of CPUs; 1 runs in this process).
+    :param max_in_flight: Maximum number of files submitted but not finished (defaults to twice max_workers).
+    :param memory_budget: Memory in bytes allowed to the files processed at once (defaults to 80% of the
+                          available memory, minus the workers' own footprint); the compressed bundles the
+                          workers keep decompressed are deducted from it.
+    :param use_cache: If True, results are looked up in and stored to a persistent result cache, so that a
+                      rerun only computes new files, estimators or parameters and an interrupted run resumes.
+    :param cache_path: Path to the result cache (defaults to mi_cache.sqlite in output_dir).
+    :param cache_max_entries: Size cap of the result cache (least recently used results are evicted).
+    :param results_store_path: Path to the results store holding every result (defaults to mi_results.sqlite
+                               in output_dir); the summary CSVs are computed from it.
+    :param write_file_csvs: If True, also write the per-file CSVs into the mi_values tree.
+    :param prefetch_depth: If positive, the files are sent to the workers in chunks and a reader thread of each
+                           worker loads the next files of its chunk, at most this many ahead, while the current
+                           one is estimated; the loaded files count against memory_budget.
     """
-    # Step 1: Navigate and select files
-    selected_files = navigate_directories(start_path=input_dir, multi_select=True, file_extension=".txt")
+    # Step 1: Navigate and select files (unless they are given, e.g. by a batch job)
+    if selected_files is None:
+        selected_files = navigate_directories(start_path=input_dir, multi_select=True,
+                                              file_extension=DATA_FILE_SUFFIXES)
+    selected_files = expand_bundles(selected_files)  # One task per replicate of the selected bundles
 
     if not selected_files:
         print("[INFO] No files selected. Exiting.")
@@ -234,39 +596,71 @@ def analyze_and_save_mi_values(input_dir, output_dir, num_bins=10):
     mi_values_dir = os.path.join(output_dir, "mi_values")
     os.makedirs(mi_values_dir, exist_ok=True)
 
-    # Step 3: Process each file and save the results
-    for file_path in selected_files:
-        try:
-            # Extract details from the file path
-            details = extract_file_details(file_path)
-            distribution_name = details["distribution_name"]
-            size = details["size"]
-            params = details["params"]
-
-            # Build the output subdirectory structure
-            subfolder_path = os.path.join(
-                mi_values_dir,
-                distribution_name,
-                params,
-                f"size_{size}"
-            )
-            os.makedirs(subfolder_path, exist_ok=True)
-
-            # Process the file and save the CSV in the corresponding subfolder
-            output_csv = process_and_save_mi_table(file_path, num_bins=num_bins)
-
-            if output_csv:
-                # Move the generated CSV to the corresponding subfolder
-                output_csv_name = os.path.basename(output_csv)
-                shutil.move(output_csv, os.path.join(subfolder_path, output_csv_name))
-
-        except Exception as e:
-            print(f"[ERROR] Failed to process file {file_path}: {e}")
-
-    # Step 4: Create summary CSVs for each folder
-    for root, dirs, files in os.walk(mi_values_dir):
-        for dir_name in dirs:
-            folder_path = os.path.join(root, dir_name)
-            create_summary_csv_for_folder(folder_path)
+    # Step 3: Process the files in parallel, largest first and within the memory budget;
+    # each worker writes its CSV into the file's subfolder
+    if results_store_path is None:
+        results_store_path = os.path.join(output_dir, "mi_results.sqlite")
+    if use_cache and cache_path is None:
+        cache_path = os.path.join(output_dir, "mi_cache.sqlite")
+
+    # Create the databases before the workers open them concurrently
+    ResultsStore(results_store_path).close()
+    if use_cache:
+        ResultCache(cache_path, max_entries=cache_max_entries).close()
+
+    table_options = dict(num_bins=num_bins, build_sort_index=build_sort_index, estimators=estimators,
+                         k_values=k_values, cache_path=cache_path if use_cache else None,
+                         cache_max_entries=cache_max_entries, results_store_path=results_store_path,
+                         write_csv=write_file_csvs)
+    max_workers = max_workers or os.cpu_count() or 1
+    k_max = max(k_values)
+    memory_of = partial(estimate_file_task_memory, k_max=k_max, prefetch_depth=prefetch_depth)
+    if prefetch_depth > 0:
+        # Each task is a chunk of files of similar size, largest first, read ahead inside its worker
+        task = partial(analyze_files_into_tree, mi_values_dir=mi_values_dir, prefetch_depth=prefetch_depth,
+                       **table_options)
+        selected_files = sorted(selected_files, key=memory_of, reverse=True)
+        chunk_size = len(selected_files) if max_workers == 1 else \
+            max(2, math.ceil(len(selected_files) / (4 * max_workers)))
+        items = [tuple(selected_files[start:start + chunk_size])
+                 for start in range(0, len(selected_files), chunk_size)]
+
+        def item_memory(chunk):
+            return memory_of(chunk[0])  # The chunk's files are sorted, so its first file is its largest
+    else:
+        task = partial(analyze_file_into_tree, mi_values_dir=mi_values_dir, **table_options)
+        items = selected_files
+        item_memory = memory_of
+
+    def report_failures(results):
+        for item, result in results:
+            if prefetch_depth > 0:
+                # A chunk that failed as a whole has no result at all
+                file_results = result if result is not None else [(file_path, None) for file_path in item]
+            else:
+                file_results = [(item, result)]
+            for file_path, output_csv in file_results:
+                if output_csv is None:
+                    print(f"[ERROR] No results for file {file_path}")
+
+    if max_workers == 1:
+        report_failures((item, task(item)) for item in items)
+    else:
+        max_in_flight = max_in_flight or 2 * max_workers
+        if memory_budget is None:
+            memory_budget = max(0, int(0.8 * available_memory()) - max_workers * WORKER_BASE_MEMORY)
+        # Each worker keeps the last compressed bundle it decompressed, besides the memory of its tasks
+        memory_budget = max(0, memory_budget - max_workers * estimate_bundle_cache_memory(selected_files))
+        oversized = [item for item in items if item_memory(item) > memory_budget]
+        if oversized:
+            print(f"[INFO] {len(oversized)} tasks exceed the memory budget of {memory_budget / 1024**3:.2f} GB "
+                  f"and will be processed one at a time.")
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=limit_nested_parallelism) as executor:
+            report_failures(run_scheduled(executor, task, items, max_in_flight, memory_of=item_memory,
+                                          memory_budget=memory_budget))
+
+    # Step 4: Rewrite the summary CSVs of the groups that received new results
+    create_summary_csvs_from_store(results_store_path, mi_values_dir)
 
     print(f"[INFO] Analysis completed. Results saved in: {mi_values_dir}")
\ No newline at end of file
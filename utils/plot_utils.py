@@ -1,9 +1,14 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import seaborn as sns
 import scipy.stats as stats
 
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from results_store import ResultsStore
+
 
 
 
@@ -91,4 +96,36 @@ def plot_marginals(samples, output_path):
     
 
     
-    
\ No newline at end of file
+    
+
+
+def plot_mi_vs_k_from_store(results_store_path, distribution, params, estimator, output_path):
+    """
+    Plot the mean and standard deviation over the files of an estimator as a function of k,
+    one curve per sample size, querying the results store of an analysis.
+
+    Parameters:
+        results_store_path (str): Path to the ResultsStore of the analysis.
+        distribution (str): Distribution name.
+        params (str): Parameter string of the distribution (as in the mi_values tree).
+        estimator (str): Estimator column, e.g. "mi_1".
+        output_path (str): Path of the saved figure.
+    """
+    with ResultsStore(results_store_path) as store:
+        sizes = sorted({size for dist, par, size in store.groups() if dist == distribution and par == params},
+                       key=lambda size: int(size) if size.isdigit() else float("inf"))
+        summaries = {size: store.summary(distribution, params, size) for size in sizes}
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for size, summary in summaries.items():
+        if f"mean_{estimator}" not in summary:
+            continue
+        ax.errorbar(summary["k"], summary[f"mean_{estimator}"], yerr=summary[f"sigma_{estimator}"],
+                    marker='o', markersize=3, capsize=2, label=f"N = {size}")
+    ax.set_xlabel("k")
+    ax.set_ylabel(f"{estimator} estimate")
+    ax.set_title(f"{distribution} ({params})")
+    ax.legend()
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
@@ -0,0 +1,260 @@
+import os
+import sys
+import math
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from math_utils import welford_update, welford_remove
+from sqlite_utils import connect_shared
+
+
+# Columns identifying one result, in primary key order
+KEY_COLUMNS = ("distribution", "params", "size", "file_index", "k", "estimator")
+
+# Columns identifying one group of replicates
+GROUP_COLUMNS = ("distribution", "params", "size")
+
+
+class ResultsStore:
+    """
+    All mutual information results of an analysis in one SQLite table, in long format: one row per
+    (distribution, params, size, file_index, k, estimator) with its value.
+
+    Next to the results the store keeps running statistics (Welford count, mean and sum of squared
+    deviations) per (distribution, params, size, k, estimator), updated in O(1) per new result, and
+    a dirty flag per group, so that only the summaries of the groups that received new results
+    need to be rewritten.
+
+    The database runs in WAL mode with a busy timeout, so the worker processes of the pipeline can
+    write concurrently, each through its own ResultsStore; every table of results is written in a
+    single transaction. Reads filter on the indexed (distribution, params, size) columns.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path to the SQLite file (created if missing).
+        """
+        self.path = path
+        # Autocommit mode: transactions are opened explicitly, with BEGIN IMMEDIATE for the updates
+        self._connection = connect_shared(path, isolation_level=None)
+
+        self._connection.execute("BEGIN IMMEDIATE")
+        has_statistics = self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'running_stats'"
+        ).fetchone() is not None
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "distribution TEXT, params TEXT, size TEXT, file_index TEXT, k INTEGER, estimator TEXT, value REAL, "
+            f"PRIMARY KEY ({', '.join(KEY_COLUMNS)}))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_group ON results (distribution, params, size)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS running_stats ("
+            "distribution TEXT, params TEXT, size TEXT, k INTEGER, estimator TEXT, count INTEGER, mean REAL, m2 REAL, "
+            "PRIMARY KEY (distribution, params, size, k, estimator))"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS groups ("
+            "distribution TEXT, params TEXT, size TEXT, dirty INTEGER, PRIMARY KEY (distribution, params, size))"
+        )
+        if not has_statistics:
+            # Store written before the running statistics existed
+            self._rebuild_running_stats()
+        self._connection.execute("COMMIT")
+
+    def _rebuild_running_stats(self):
+        """Recompute the running statistics and mark every group dirty (inside an open transaction)."""
+        self._connection.execute("DELETE FROM running_stats")
+        self._connection.execute("DELETE FROM groups")
+        for record in self._connection.execute(
+            f"SELECT {', '.join(KEY_COLUMNS)}, value FROM results WHERE value IS NOT NULL"
+        ).fetchall():
+            self._add_to_statistics(record[:3], record[4], record[5], record[6], previous=None)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO groups SELECT DISTINCT distribution, params, size, 1 FROM results"
+        )
+
+    def _add_to_statistics(self, group, k, estimator, value, previous):
+        """Update the running statistics of one (group, k, estimator) with a new or replaced value."""
+        key = tuple(group) + (k, estimator)
+        row = self._connection.execute(
+            "SELECT count, mean, m2 FROM running_stats "
+            "WHERE distribution = ? AND params = ? AND size = ? AND k = ? AND estimator = ?", key
+        ).fetchone()
+        count, mean, m2 = row if row is not None else (0, 0.0, 0.0)
+        if previous is not None:
+            count, mean, m2 = welford_remove(count, mean, m2, previous)
+        if value is not None:
+            count, mean, m2 = welford_update(count, mean, m2, value)
+        self._connection.execute("INSERT OR REPLACE INTO running_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 key + (count, mean, m2))
+
+    def add_table(self, details, rows):
+        """
+        Store the MI table of one data file, replacing the results of a previous run, and update the
+        running statistics of its group.
+
+        :param details: Dictionary of extract_file_details with distribution_name, params, size and file_index.
+        :param rows: Table as written to the per-file CSV: a header ["k", estimator, ...] followed by one row per k.
+        """
+        header, *values = rows
+        group = (details["distribution_name"], details["params"], str(details["size"]))
+        key_prefix = group + (details["file_index"],)
+
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            changed = False
+            for row in values:
+                k = int(row[0])
+                for estimator, value in zip(header[1:], row[1:]):
+                    value = None if value is None or math.isnan(value) else float(value)
+                    key = key_prefix + (k, estimator)
+                    previous = self._connection.execute(
+                        "SELECT value FROM results WHERE distribution = ? AND params = ? AND size = ? "
+                        "AND file_index = ? AND k = ? AND estimator = ?", key
+                    ).fetchone()
+                    if previous is not None and previous[0] == value:
+                        continue
+                    self._connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                             key + (value,))
+                    self._add_to_statistics(group, k, estimator, value,
+                                            previous=None if previous is None else previous[0])
+                    changed = True
+            if changed:
+                self._connection.execute("INSERT OR REPLACE INTO groups VALUES (?, ?, ?, 1)", group)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+    def groups(self, dirty_only=False):
+        """
+        List the (distribution, params, size) groups present in the store.
+
+        :param dirty_only: If True, only the groups that received results since they were last marked clean.
+        """
+        where = " WHERE dirty = 1" if dirty_only else ""
+        return self._connection.execute(
+            f"SELECT distribution, params, size FROM groups{where} ORDER BY distribution, params, size"
+        ).fetchall()
+
+    def mark_clean(self, group):
+        """
+        Clear the dirty flag of a (distribution, params, size) group, once its summary has been written.
+        """
+        self._connection.execute(
+            "UPDATE groups SET dirty = 0 WHERE distribution = ? AND params = ? AND size = ?", tuple(group)
+        )
+
+    def query(self, **filters):
+        """
+        Results matching the given column values, e.g. query(distribution="gauss", size="1000").
+
+        :param filters: Values of any of the KEY_COLUMNS; a list or tuple matches any of its values.
+        :return: DataFrame with the KEY_COLUMNS and the value.
+        """
+        conditions = []
+        arguments = []
+        for column, value in filters.items():
+            if column not in KEY_COLUMNS:
+                raise ValueError(f"Unknown column '{column}'; valid columns are {KEY_COLUMNS}.")
+            values = value if isinstance(value, (list, tuple)) else [value]
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            arguments.extend(values)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return pd.read_sql_query(f"SELECT * FROM results{where}", self._connection, params=arguments)
+
+    def running_stats(self, distribution, params, size):
+        """
+        Running statistics of one group.
+
+        :return: DataFrame with the columns k, estimator, count, mean and sigma (population standard deviation).
+        """
+        statistics = pd.read_sql_query(
+            "SELECT k, estimator, count, mean, m2 FROM running_stats "
+            "WHERE distribution = ? AND params = ? AND size = ? ORDER BY k",
+            self._connection, params=(distribution, params, str(size)),
+        )
+        statistics["sigma"] = (statistics["m2"] / statistics["count"]).clip(lower=0) ** 0.5
+        return statistics.drop(columns="m2")
+
+    def max_standard_error(self, distribution, params, size, estimators=None, k_values=None):
+        """
+        Largest standard error of the mean over the k values and estimators of a group, from the running
+        statistics (infinite while some result has fewer than two replicates).
+
+        :param estimators: Estimators to consider (defaults to all those of the group).
+        :param k_values: Values of k to consider (defaults to all those of the group).
+        """
+        statistics = self.running_stats(distribution, params, size)
+        if estimators is not None:
+            statistics = statistics[statistics["estimator"].isin(list(estimators))]
+        if k_values is not None:
+            statistics = statistics[statistics["k"].isin([int(k) for k in k_values])]
+        if statistics.empty or (statistics["count"] < 2).any():
+            return math.inf
+        if estimators is not None and k_values is not None and \
+                len(statistics) < len(set(estimators)) * len(set(int(k) for k in k_values)):
+            return math.inf  # Some requested result has no replicate yet
+        return float((statistics["sigma"] / (statistics["count"] - 1) ** 0.5).max())
+
+    def completed_replicates(self, distribution, params, size, estimators=None, k_values=None):
+        """
+        File indices of the replicates of a group that have a result (NaN included) for every estimator
+        and k requested.
+
+        :param estimators: Estimators required (defaults to all those of the group).
+        :param k_values: Values of k required (defaults to all those of the group).
+        :return: Set of file indices.
+        """
+        group = (distribution, params, str(size))
+        where = "distribution = ? AND params = ? AND size = ?"
+        if estimators is None:
+            estimators = [row[0] for row in self._connection.execute(
+                f"SELECT DISTINCT estimator FROM results WHERE {where}", group)]
+        if k_values is None:
+            k_values = [row[0] for row in self._connection.execute(
+                f"SELECT DISTINCT k FROM results WHERE {where}", group)]
+        estimators, k_values = sorted(set(estimators)), sorted(set(int(k) for k in k_values))
+        if not estimators or not k_values:
+            return set()
+        rows = self._connection.execute(
+            f"SELECT file_index FROM results WHERE {where} "
+            f"AND estimator IN ({', '.join('?' * len(estimators))}) AND k IN ({', '.join('?' * len(k_values))}) "
+            "GROUP BY file_index HAVING COUNT(*) = ?",
+            group + tuple(estimators) + tuple(k_values) + (len(estimators) * len(k_values),),
+        )
+        return {row[0] for row in rows}
+
+    def replicate_count(self, distribution, params, size, estimators=None, k_values=None):
+        """
+        Number of replicates of a group with results for every estimator and k requested, i.e. the
+        smallest number of replicates over them (see completed_replicates).
+        """
+        return len(self.completed_replicates(distribution, params, size, estimators, k_values))
+
+    def summary(self, distribution, params, size):
+        """
+        Mean and standard deviation over the files of one group, for each k and estimator, read from the
+        running statistics.
+
+        :return: DataFrame with the column k and mean_<estimator>, sigma_<estimator> for each estimator,
+                 the layout of the *_mean_error.csv summaries.
+        """
+        statistics = self.running_stats(distribution, params, size)
+        table = statistics.pivot(index="k", columns="estimator", values=["mean", "sigma"])
+
+        summary = pd.DataFrame({"k": table.index.to_numpy()})
+        for estimator in statistics["estimator"].unique():
+            summary[f"mean_{estimator}"] = table[("mean", estimator)].to_numpy()
+            summary[f"sigma_{estimator}"] = table[("sigma", estimator)].to_numpy()
+        return summary
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,213 @@
+import os
+import bisect
+import queue
+import threading
+from concurrent.futures import wait, FIRST_COMPLETED
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
+import numpy as np
+from io_utils import data_file_rows, split_member_path, bundle_shape
+
+
+# Environment variables read by the BLAS/OpenMP runtimes when they start
+THREAD_ENV_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "VECLIB_MAXIMUM_THREADS",
+                        "NUMEXPR_NUM_THREADS")
+
+# Fixed memory of a worker process (interpreter, numpy, scipy, sklearn) in bytes
+WORKER_BASE_MEMORY = 200 * 1024**2
+
+
+def estimate_task_memory(n_samples, k_max, n_variables=2, safety_factor=1.5):
+    """
+    Rough peak memory of the MI table of one dataset, in bytes.
+
+    The dominant terms are the k-nearest-neighbor query in the joint space (distances and indices
+    for k_max + 1 neighbors, plus sklearn's working copies) and the column sort index; the model
+    was calibrated on the default estimators (about 1.1 kB per sample for k_max = 30 and two
+    variables).
+
+    :param n_samples: Number of samples of the dataset.
+    :param k_max: Largest number of nearest neighbors of the sweep.
+    :param n_variables: Number of variables (columns) of the dataset.
+    :param safety_factor: Multiplicative margin applied to the estimate.
+    :return: Estimated memory in bytes.
+    """
+    bytes_per_sample = 32 * (k_max + 1) + 64 * n_variables
+    return int(safety_factor * n_samples * bytes_per_sample)
+
+
+def estimate_loaded_data_memory(n_samples, n_variables=2):
+    """
+    Memory of a loaded dataset waiting to be processed, in bytes: the data and its column sort index
+    (order and sorted values).
+
+    :param n_samples: Number of samples of the dataset.
+    :param n_variables: Number of variables (columns) of the dataset.
+    :return: Memory in bytes.
+    """
+    return 3 * 8 * n_samples * n_variables
+
+
+def estimate_file_rows(file_path):
+    """
+    Estimate the number of rows of a data file: exact for .npy files and bundle replicates (read from
+    the header), from the size and the length of the first line for text files.
+
+    :param file_path: Path to the data file.
+    :return: Estimated number of rows.
+    """
+    rows = data_file_rows(file_path)
+    if rows is not None:
+        return max(1, rows)
+    with open(file_path, 'rb') as file:
+        first_line = file.readline()
+    return max(1, os.path.getsize(file_path) // max(1, len(first_line)))
+
+
+def estimate_bundle_cache_memory(file_paths):
+    """
+    Memory a worker keeps for the compressed bundles, in bytes: load_data decompresses a whole
+    compressed bundle and keeps the last one, so every worker may hold the largest bundle of the files.
+
+    :param file_paths: Data files and bundle member references to be processed.
+    :return: Decompressed size of the largest compressed bundle among the files (0 without any).
+    """
+    bundles = {split_member_path(file_path)[0] for file_path in file_paths}
+    return max((8 * int(np.prod(bundle_shape(bundle_path))) for bundle_path in bundles
+                if bundle_path.endswith(".npz")), default=0)
+
+
+def available_memory():
+    """
+    Memory available for new processes, in bytes (MemAvailable on Linux, physical memory otherwise).
+    """
+    try:
+        with open("/proc/meminfo", 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+def limit_nested_parallelism(n_threads=1):
+    """
+    Cap the threads of BLAS/OpenMP libraries and run joblib sequentially in the current process.
+
+    Used as initializer of the pipeline worker processes: the pool already occupies every core, so
+    nested thread pools or loky pools (e.g. n_jobs in mutual_information_1) only oversubscribe
+    the CPUs, and nested loky pools would also keep the workers from exiting.
+
+    :param n_threads: Number of threads allowed to each native thread pool.
+    """
+    for variable in THREAD_ENV_VARIABLES:
+        os.environ[variable] = str(n_threads)
+    threadpool_limits(limits=n_threads)
+    parallel_config(backend="sequential")
+
+
+def run_scheduled(executor, task, items, max_in_flight, memory_of=None, memory_budget=None):
+    """
+    Submit task(item) for every item to an executor and yield (item, result) pairs as the tasks
+    complete.
+
+    Items are scheduled largest-first by their memory estimate, so the long tasks do not end up
+    alone at the tail of the run. A task is admitted only while at most max_in_flight tasks are
+    pending and the estimates of the running tasks plus its own fit in the memory budget; when the
+    largest waiting task does not fit, the largest one that does is admitted instead. A task larger
+    than the whole budget runs alone.
+
+    :param executor: A concurrent.futures executor.
+    :param task: Picklable callable taking one item.
+    :param items: Iterable of items.
+    :param max_in_flight: Maximum number of pending tasks.
+    :param memory_of: Callable giving the estimated memory of an item in bytes (None: no budget).
+    :param memory_budget: Total memory allowed to the running tasks in bytes (None: no budget).
+    """
+    items = list(items)
+    if memory_of is None:
+        memories = [0] * len(items)
+    else:
+        memories = [memory_of(item) for item in items]
+
+    # Waiting items sorted by increasing memory, so the largest is at the end
+    order = sorted(range(len(items)), key=lambda index: memories[index])
+    waiting_memories = [memories[index] for index in order]
+
+    pending = {}
+    memory_in_use = 0
+    while pending or order:
+        while order and len(pending) < max_in_flight:
+            if memory_budget is None or not pending:
+                position = len(order) - 1
+            else:
+                # Largest waiting item that fits in the remaining budget
+                position = bisect.bisect_right(waiting_memories, memory_budget - memory_in_use) - 1
+                if position < 0:
+                    break
+            index = order.pop(position)
+            waiting_memories.pop(position)
+            memory_in_use += memories[index]
+            pending[executor.submit(task, items[index])] = index
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = pending.pop(future)
+            memory_in_use -= memories[index]
+            try:
+                yield items[index], future.result()
+            except Exception as e:
+                print(f"[ERROR] Task failed for {items[index]}: {e}")
+                yield items[index], None
+
+
+def prefetch(items, load, depth):
+    """
+    Load items in a background thread, at most depth items ahead of the consumer, and yield
+    (item, loaded) pairs in the order of the items.
+
+    The bounded queue applies back-pressure: the reader blocks once depth loaded items are waiting,
+    so I/O overlaps with the processing of the previous items without loading the whole input into
+    memory. If load raises, the exception is yielded in place of the loaded value.
+
+    :param items: Iterable of items.
+    :param load: Callable loading one item.
+    :param depth: Maximum number of loaded items waiting to be consumed.
+    """
+    if depth < 1:
+        raise ValueError("'depth' must be a positive integer.")
+    loaded_items = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+    end = object()
+
+    def put(entry):
+        # Wait for room in the queue, unless the consumer went away
+        while not stopped.is_set():
+            try:
+                loaded_items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        for item in items:
+            try:
+                loaded = load(item)
+            except Exception as e:
+                loaded = e
+            if not put((item, loaded)):
+                return
+        put((end, None))
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, loaded = loaded_items.get()
+            if item is end:
+                return
+            yield item, loaded
+    finally:
+        stopped.set()
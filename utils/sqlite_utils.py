@@ -0,0 +1,19 @@
+import sqlite3
+
+
+def connect_shared(path, **connect_options):
+    """
+    Open a SQLite database that several processes write concurrently: WAL mode, so that readers do
+    not block the writer, a busy timeout instead of immediate "database is locked" errors, and
+    synchronous=NORMAL, which is safe in WAL mode.
+
+    :param path: Path to the SQLite file (created if missing).
+    :param connect_options: Further arguments of sqlite3.connect (e.g. isolation_level).
+    :return: The connection.
+    """
+    connection = sqlite3.connect(path, timeout=60, **connect_options)
+    # WAL mode is persistent: switch only once, since switching needs an exclusive lock
+    if connection.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+        connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from mutual_information_utils import (MI_ESTIMATORS, memoized_estimate, extract_file_details,
+                                      create_summary_csvs_from_store)
+from io_utils import load_data_with_sort_index, build_sort_index
+from results_store import ResultsStore
+from scheduling_utils import limit_nested_parallelism
+
+
+# Subdirectories of a queue: a task file moves pending -> claimed -> done (or failed), and its
+# result is written to results until a collector moves it into the results store
+QUEUE_STATES = ("pending", "claimed", "done", "failed", "results")
+
+
+def _queue_path(queue_dir, state, task_id=None):
+    path = os.path.join(queue_dir, state)
+    return path if task_id is None else os.path.join(path, f"{task_id}.json")
+
+
+def _write_json_atomically(path, payload):
+    """Write a JSON file under a temporary name and rename it, so readers never see a partial file."""
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w') as file:
+        json.dump(payload, file)
+    os.replace(temporary_path, path)
+
+
+def _filesystem_now(queue_dir):
+    """
+    Current time of the shared filesystem, read back from the modification time of a probe file, so
+    that leases are compared with the clock that stamped them even when the nodes' clocks differ.
+    """
+    probe_path = os.path.join(queue_dir, f".clock.{os.getpid()}")
+    with open(probe_path, 'w'):
+        pass
+    now = os.stat(probe_path).st_mtime
+    os.remove(probe_path)
+    return now
+
+
+def init_queue(queue_dir):
+    """Create the state subdirectories of a queue."""
+    for state in QUEUE_STATES:
+        os.makedirs(_queue_path(queue_dir, state), exist_ok=True)
+
+
+def _file_key(file_path):
+    """Prefix of the ids of the tasks of a data file."""
+    return hashlib.sha1(file_path.encode()).hexdigest()[:12]
+
+
+def publish_tasks(queue_dir, file_paths, estimators, k_values, num_bins=10, k_chunk_size=10):
+    """
+    Publish one task per data file, estimator and chunk of k values.
+
+    Estimators that do not depend on k get one task for the whole sweep. Task ids are hashes of their
+    content, so publishing the same tasks again does not duplicate them, prefixed with the hash of the
+    data file, so that the tasks of one file can be claimed together (see claim_task).
+
+    :param queue_dir: Queue directory on the shared filesystem.
+    :param file_paths: Data files to analyze (paths must be valid on every node).
+    :param estimators: Names of the MI_ESTIMATORS to evaluate.
+    :param k_values: Numbers of nearest neighbors of the sweep.
+    :param num_bins: Number of bins for the binning estimators.
+    :param k_chunk_size: Number of k values per task.
+    :return: Number of newly published tasks.
+    """
+    init_queue(queue_dir)
+    k_values = [int(k) for k in k_values]
+    published = 0
+    for file_path in file_paths:
+        file_path = os.path.abspath(file_path)
+        file_key = _file_key(file_path)
+        for estimator in estimators:
+            if "k" in MI_ESTIMATORS[estimator]["params"]:
+                k_chunks = [k_values[i:i + k_chunk_size] for i in range(0, len(k_values), k_chunk_size)]
+            else:
+                k_chunks = [k_values]
+            for k_chunk in k_chunks:
+                task = {"file_path": file_path, "estimator": estimator, "k_values": k_chunk, "num_bins": num_bins}
+                task_id = f"{file_key}-{hashlib.sha1(json.dumps(task, sort_keys=True).encode()).hexdigest()}"
+                if any(os.path.exists(_queue_path(queue_dir, state, task_id)) for state in QUEUE_STATES):
+                    continue
+                _write_json_atomically(_queue_path(queue_dir, "pending", task_id), dict(task, attempts=0))
+                published += 1
+    return published
+
+
+def claim_task(queue_dir, file_path=None):
+    """
+    Claim a pending task by renaming it into claimed/, which is atomic: when several workers race
+    for the same task exactly one rename succeeds.
+
+    The tasks of file_path (the file the worker has loaded) are claimed first. Otherwise a worker starts
+    on the file of a random pending task, so that concurrent workers spread over different files.
+
+    :param file_path: Data file whose tasks are preferred.
+    :return: (task_id, task) of the claimed task, or None if no task is pending.
+    """
+    entries = [entry for entry in os.scandir(_queue_path(queue_dir, "pending")) if entry.name.endswith(".json")]
+    preferred = None if file_path is None else _file_key(file_path) + "-"
+    if preferred is None or not any(entry.name.startswith(preferred) for entry in entries):
+        random.shuffle(entries)
+    else:
+        entries.sort(key=lambda entry: not entry.name.startswith(preferred))
+    for entry in entries:
+        claimed_path = _queue_path(queue_dir, "claimed", entry.name[:-len(".json")])
+        try:
+            # Start of the lease, set before the rename so that a reaper never sees the pending mtime in claimed/
+            os.utime(entry.path)
+            os.rename(entry.path, claimed_path)
+        except FileNotFoundError:
+            continue  # Claimed by another worker
+        with open(claimed_path, 'r') as file:
+            task = json.load(file)
+        task["attempts"] += 1
+        _write_json_atomically(claimed_path, task)
+        return entry.name[:-len(".json")], task
+    return None
+
+
+def reap_expired_leases(queue_dir, lease_timeout):
+    """
+    Return to pending/ the claimed tasks whose lease was not renewed for lease_timeout seconds
+    (their worker died or lost access to the filesystem).
+
+    :return: Number of tasks returned to the queue.
+    """
+    now = _filesystem_now(queue_dir)
+    reaped = 0
+    for entry in os.scandir(_queue_path(queue_dir, "claimed")):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            if now - entry.stat().st_mtime <= lease_timeout:
+                continue
+            os.rename(entry.path, _queue_path(queue_dir, "pending", entry.name[:-len(".json")]))
+            reaped += 1
+        except FileNotFoundError:
+            continue  # Finished or reaped meanwhile
+    return reaped
+
+
+class LeaseHeartbeat:
+    """
+    Background thread renewing the lease of a claimed task (the modification time of its file) until
+    stopped, or until the file disappears because the lease was reaped.
+    """
+
+    def __init__(self, claimed_path, interval):
+        self._claimed_path = claimed_path
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                os.utime(self._claimed_path)
+            except FileNotFoundError:
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def execute_task(task, loaded=None):
+    """
+    Compute the results of a task.
+
+    :param task: Task dictionary (file_path, estimator, k_values, num_bins).
+    :param loaded: Optional dictionary reused across calls to keep the last data file in memory.
+    :return: Dictionary mapping each k to its MI value.
+    """
+    loaded = {} if loaded is None else loaded
+    if loaded.get("file_path") != task["file_path"]:
+        data, sort_index = load_data_with_sort_index(task["file_path"])
+        if sort_index is None:
+            sort_index = build_sort_index(data)
+        loaded.clear()
+        loaded.update(file_path=task["file_path"], data=data, sort_index=sort_index, memo={})
+
+    return {
+        k: memoized_estimate(loaded["memo"], task["estimator"], loaded["data"],
+                             {"k": k, "num_bins": task["num_bins"]}, loaded["sort_index"])
+        for k in task["k_values"]
+    }
+
+
+def run_worker(queue_dir, lease_timeout=600, poll_interval=5, max_attempts=3, exit_when_idle=True):
+    """
+    Claim and execute tasks of a queue until it is drained.
+
+    Any number of workers, on any node that mounts the queue directory, can run concurrently. While a
+    task runs its lease is renewed every lease_timeout / 3 seconds; an idle worker returns the tasks
+    with expired leases to the queue. A task that raises goes straight back to pending/, and a task that
+    failed or expired max_attempts times is moved to failed/ (with the last error, if any).
+
+    :param queue_dir: Queue directory on the shared filesystem.
+    :param lease_timeout: Seconds without heartbeat after which a claimed task is considered abandoned.
+    :param poll_interval: Seconds between polls while other workers still hold tasks.
+    :param max_attempts: Maximum number of claims of a task.
+    :param exit_when_idle: If True, return once no task is pending or claimed; otherwise keep polling.
+    :return: Number of tasks executed by this worker.
+    """
+    limit_nested_parallelism()
+    init_queue(queue_dir)
+    loaded = {}
+    executed = 0
+    while True:
+        claimed = claim_task(queue_dir, loaded.get("file_path"))
+        if claimed is None:
+            if reap_expired_leases(queue_dir, lease_timeout):
+                continue
+            if exit_when_idle and not any(
+                    entry.name.endswith(".json") for entry in os.scandir(_queue_path(queue_dir, "claimed"))):
+                return executed
+            time.sleep(poll_interval)
+            continue
+
+        task_id, task = claimed
+        claimed_path = _queue_path(queue_dir, "claimed", task_id)
+        if task["attempts"] > max_attempts:
+            print(f"[ERROR] Task {task_id} ({task['file_path']}, {task['estimator']}) failed {max_attempts} times.")
+            os.replace(claimed_path, _queue_path(queue_dir, "failed", task_id))
+            continue
+
+        try:
+            with LeaseHeartbeat(claimed_path, lease_timeout / 3):
+                values = execute_task(task, loaded)
+        except Exception as e:
+            # Returned to the queue at once for another attempt, or moved to failed/ after the last one
+            print(f"[ERROR] Task {task_id} ({task['file_path']}, {task['estimator']}) failed: {e}")
+            state = "failed" if task["attempts"] >= max_attempts else "pending"
+            try:
+                os.replace(claimed_path, _queue_path(queue_dir, state, task_id))
+            except FileNotFoundError:
+                continue  # Lease reaped meanwhile; the task is already back in the queue
+            if state == "failed":
+                _write_json_atomically(_queue_path(queue_dir, state, task_id), dict(task, error=str(e)))
+            continue
+
+        _write_json_atomically(_queue_path(queue_dir, "results", task_id), dict(task, values=values))
+        try:
+            os.replace(claimed_path, _queue_path(queue_dir, "done", task_id))
+        except FileNotFoundError:
+            pass  # Lease reaped meanwhile; the result is written anyway and the retry overwrites it
+        executed += 1
+
+
+def collect_results(queue_dir, results_store_path, mi_values_dir=None):
+    """
+    Move the results written by the workers into a results store (a single writer, so the store does
+    not need to be on the shared filesystem) and optionally update the summary CSVs.
+
+    :param queue_dir: Queue directory.
+    :param results_store_path: Path to the ResultsStore.
+    :param mi_values_dir: If given, root of the mi_values tree where the dirty summaries are rewritten.
+    :return: Number of collected results.
+    """
+    collected = 0
+    with ResultsStore(results_store_path) as store:
+        for entry in os.scandir(_queue_path(queue_dir, "results")):
+            if not entry.name.endswith(".json"):
+                continue
+            with open(entry.path, 'r') as file:
+                result = json.load(file)
+            rows = [["k", result["estimator"]]] + [[int(k), value] for k, value in result["values"].items()]
+            store.add_table(extract_file_details(result["file_path"]), rows)
+            os.remove(entry.path)
+            collected += 1
+    if mi_values_dir is not None:
+        create_summary_csvs_from_store(results_store_path, mi_values_dir)
+    return collected
+
+
+def queue_status(queue_dir):
+    """Number of task files in each state of a queue."""
+    return {
+        state: sum(entry.name.endswith(".json") for entry in os.scandir(_queue_path(queue_dir, state)))
+        for state in QUEUE_STATES
+    }